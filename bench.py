@@ -0,0 +1,304 @@
+import argparse
+import bisect
+import io
+import itertools
+import json
+import os
+import random
+import tempfile
+import time
+
+from gestures import TimingWheel, GestureDetector
+import journal
+
+
+def _per_op_ns(elapsed, ops):
+    return elapsed * 1e9 / ops
+
+
+class SortedTimerList:
+    # 对照组：按到期时间排序的列表，调度/取消都是 O(n)
+    def __init__(self):
+        self._timers = []
+        self._seq = itertools.count()
+
+    def schedule(self, delay_ms, callback):
+        timer = (delay_ms, next(self._seq), callback)
+        bisect.insort(self._timers, timer)
+        return timer
+
+    def cancel(self, timer):
+        i = bisect.bisect_left(self._timers, timer)
+        del self._timers[i]
+
+
+def bench_wheel(args):
+    print("定时器调度/取消 (每次操作耗时, ns)")
+    print(f"{'待触发数':>10} {'时间轮 调度':>12} {'时间轮 取消':>12} {'有序列表 调度':>14} {'有序列表 取消':>14}")
+
+    noop = lambda: None
+    for pending in args.sizes:
+        delays = [random.randint(1, 5000) for _ in range(pending)]
+        row = []
+        for factory in (TimingWheel, SortedTimerList):
+            timers = factory()
+            start = time.perf_counter()
+            handles = [timers.schedule(d, noop) for d in delays]
+            schedule_ns = _per_op_ns(time.perf_counter() - start, pending)
+
+            random.shuffle(handles)
+            start = time.perf_counter()
+            for handle in handles:
+                timers.cancel(handle)
+            cancel_ns = _per_op_ns(time.perf_counter() - start, pending)
+            row += [schedule_ns, cancel_ns]
+
+        print(f"{pending:>10} {row[0]:>12.0f} {row[1]:>12.0f} {row[2]:>14.0f} {row[3]:>14.0f}")
+
+
+def bench_gestures(args):
+    # 模拟大量按键同时按住（每个都挂着长按计时器），再全部松开
+    wheel = TimingWheel()
+    fired = []
+    detector = GestureDetector(wheel, lambda key, gesture: fired.append(gesture))
+
+    print("手势识别 (按下 + 松开, 每个按键耗时, ns)")
+    for pending in args.sizes:
+        keys = [f"key{i}" for i in range(pending)]
+        detector.configure({key: ("long_press", "double_tap") for key in keys})
+        fired.clear()
+
+        start = time.perf_counter()
+        for key in keys:
+            detector.press(key)
+        press_ns = _per_op_ns(time.perf_counter() - start, pending)
+        assert len(wheel) == pending
+
+        start = time.perf_counter()
+        for key in keys:
+            detector.release(key)
+        release_ns = _per_op_ns(time.perf_counter() - start, pending)
+
+        print(f"{pending:>10} 按下 {press_ns:>8.0f}  松开 {release_ns:>8.0f}  单击 {fired.count('tap')}")
+
+
+def _percentile(values, pct):
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * pct / 100))]
+
+
+def _replay_config(args, records):
+    # 监控按键和手势取自记录时使用的配置文件（默认为日志旁边的 config.json），
+    # 找不到时根据日志推断：被处理过的按键都算监控按键，手势按键同时启用长按和双击
+    path = args.config or os.path.join(os.path.dirname(os.path.abspath(args.path)), "config.json")
+    if os.path.exists(path):
+        with open(path, 'r', encoding='utf-8') as f:
+            saved = json.load(f)
+        config = {key: saved[key] for key in ("monitored_keys", "gestures", "long_press_ms", "double_tap_ms") if key in saved}
+        return config, path
+
+    handled = [r for r in records if r[3] != journal.RESULT_IGNORED and r[5]]
+    config = {
+        "monitored_keys": list(dict.fromkeys(r[5] for r in handled)),
+        "gestures": {r[5]: {"long_press": None, "double_tap": None} for r in handled if r[3] == journal.RESULT_GESTURE},
+    }
+    return config, None
+
+
+def bench_replay(args):
+    # 把日志中的事件按记录时间重新送入无界面 OSD：FakeHook -> 分发 -> 手势 -> OSD
+    import headless
+
+    records = journal.read_journal(args.path)
+    if not records:
+        print("日志为空")
+        return
+
+    config, config_path = _replay_config(args, records)
+    # 手势阈值以记录时实际生效的值为准
+    long_press_ms, double_tap_ms = journal.read_thresholds(args.path)
+    if long_press_ms:
+        config["long_press_ms"] = long_press_ms
+    if double_tap_ms:
+        config["double_tap_ms"] = double_tap_ms
+
+    clock = [records[0][0]]
+    loop, renderer, hook, osd = _headless_osd(headless.NullRenderer, clock=lambda: clock[0], **config)
+    fired = []
+    on_gesture = osd.gestures.on_gesture
+    def count_gesture(key, gesture):
+        fired.append(gesture)
+        on_gesture(key, gesture)
+    osd.gestures.on_gesture = count_gesture
+
+    event_types = {journal.EVENT_DOWN: hook.KEY_DOWN, journal.EVENT_UP: hook.KEY_UP}
+    start = time.perf_counter()
+    for timestamp, scan_code, event_type, _, _, name in records:
+        clock[0] = timestamp
+        loop.update()
+        hook.send(name, event_types.get(event_type, hook.KEY_DOWN), scan_code, timestamp)
+        loop.update()
+    # 触发最后一次按键之后仍在等待的长按/双击计时器
+    clock[0] += 10
+    loop.update()
+    elapsed = time.perf_counter() - start
+
+    handled = [r for r in records if r[3] != journal.RESULT_IGNORED]
+    render = [r[4] for r in records if r[4] > 0]
+    print(f"配置: {config_path or '未找到配置文件, 根据日志推断'}; "
+          f"长按 {osd.gestures.long_press_ms}ms, 双击 {osd.gestures.double_tap_ms}ms")
+    print(f"日志记录 {len(records)} 条, 其中被处理 {len(handled)} 条, 记录的显示 {len(render)} 次")
+    print(f"回放耗时 {elapsed * 1000:.2f}ms, 每事件 {_per_op_ns(elapsed, len(records)):.0f}ns, 回放显示 {renderer.messages} 次")
+    print("手势: " + ", ".join(f"{g}={fired.count(g)}" for g in ("tap", "long_press", "double_tap")))
+    print(f"记录的渲染耗时: p50={_percentile(render, 50):.2f}ms p99={_percentile(render, 99):.2f}ms")
+
+
+def _headless_osd(renderer_class, clock=time.monotonic, **config):
+    # 配置文件放在临时目录，不影响用户配置
+    import headless
+
+    config.setdefault("monitored_keys", ["a", "b", "c", "shift"])
+    return headless.create_osd(os.path.join(tempfile.mkdtemp(), "config.json"), renderer_class, clock=clock, **config)
+
+
+def bench_pipeline(args):
+    # 用空渲染器 / 日志渲染器分别测量，区分事件流水线与渲染的开销
+    import headless
+
+    keys = ["a", "b", "c", "shift", "x"]
+    print("事件流水线吞吐 (钩子 -> 分发 -> 手势 -> OSD)")
+    log_renderer = lambda loop: headless.LogRenderer(loop, io.StringIO())
+    for renderer_class in (headless.NullRenderer, log_renderer):
+        for count in args.sizes:
+            loop, renderer, hook, osd = _headless_osd(renderer_class)
+            start = time.perf_counter()
+            for i in range(count):
+                hook.tap(keys[i % len(keys)])
+            hook_elapsed = time.perf_counter() - start
+            loop.update()
+            elapsed = time.perf_counter() - start
+
+            print(f"{type(renderer).__name__:>12} {count:>8} 事件: "
+                  f"钩子侧 {_per_op_ns(hook_elapsed, count):>6.0f}ns/键, "
+                  f"总计 {count / elapsed:>9.0f} 键/秒, 显示 {renderer.messages} 次")
+
+
+def bench_suspend(args):
+    # 注意：这里使用 FakeHook，只测量回调分发（钩子来源 -> OSD）的开销，
+    # 不包含系统钩子本身。启用 win32_hook 时，Windows 下暂停会卸载系统钩子，
+    # 按键不再进入 Python，这部分开销为零，无法在此测量。
+    import headless
+    import suspend
+
+    clock = [0.0]
+    loop, renderer, hook, osd = _headless_osd(headless.NullRenderer)
+    provider = suspend.FakeForegroundProvider()
+    controller = suspend.SuspendController(osd, provider, clock=lambda: clock[0])
+
+    print("每次按键的回调分发开销 (ns, FakeHook, 不含系统钩子)")
+    for count in args.sizes:
+        results = []
+        for fullscreen in (False, True):
+            provider.set_state(fullscreen=fullscreen)
+            start = time.perf_counter()
+            for _ in range(count):
+                hook.tap("a")
+            elapsed = time.perf_counter() - start
+            results.append(_per_op_ns(elapsed, count))
+            clock[0] += elapsed
+            loop.update()
+        print(f"{count:>10} 已安装 {results[0]:>8.0f}  已暂停 {results[1]:>8.0f}  "
+              f"暂停时仍有回调: {'是' if hook.hooked() else '否'}")
+        provider.set_state(fullscreen=False)
+
+    stats = controller.stats()
+    print(f"钩子安装 {stats['hooked_seconds']:.3f}s, 暂停 {stats['suspended_seconds']:.3f}s, "
+          f"切换 {stats['transitions']} 次")
+
+
+def bench_preview(args):
+    # 模拟拖动字体/透明度/圆角滑块：每 2ms 一个事件，对比逐次全量应用与按帧合并预览
+    import headless
+    from main import AppearancePreview
+
+    def drag(values):
+        # 返回 (属性名, 值) 序列，三个滑块依次拖动
+        for name, start, stop, step in values:
+            value = start
+            while value <= stop:
+                yield name, value
+                value = round(value + step, 2)
+
+    sliders = [("font_size", 10, 48, 1), ("opacity", 0.1, 1.0, 0.1), ("corner_radius", 0, 100, 1)]
+    ticks = list(drag(sliders)) * args.repeat
+
+    print(f"滑块事件 {len(ticks)} 个")
+    print(f"{'方式':>8} {'写盘':>6} {'背景重绘':>8} {'窗口几何':>8} {'窗口属性':>8} {'样式更新':>8}")
+    for mode in ("full", "preview"):
+        clock = [0.0]
+        loop, renderer, hook, osd = _headless_osd(headless.NullRenderer, clock=lambda: clock[0])
+        config_manager = osd.config_manager
+        saves = [0]
+        save_config = config_manager.save_config
+        def counting_save():
+            saves[0] += 1
+            save_config()
+        config_manager.save_config = counting_save
+
+        config = dict(config_manager.get_config())
+        base = (renderer.redraws, renderer.geometry_updates, renderer.attribute_updates, renderer.style_updates)
+        preview = AppearancePreview(loop, config_manager, lambda: osd)
+
+        for name, value in ticks:
+            config[name] = value
+            if mode == "full":
+                # 当前行为：每个滑块事件都写盘并完整重新应用外观
+                config_manager.update_appearance(config["bg_color"], config["text_color"], config["border_color"],
+                                                 config["font_size"], config["opacity"], config["corner_radius"])
+                osd.apply_appearance()
+                osd.show_message("预览样式 ABC")
+            else:
+                preview.update(**{name: value})
+            clock[0] += 0.002
+            loop.update()
+
+        if mode == "preview":
+            preview.commit(config["bg_color"], config["text_color"], config["border_color"],
+                           config["font_size"], config["opacity"], config["corner_radius"])
+
+        counts = (renderer.redraws, renderer.geometry_updates, renderer.attribute_updates, renderer.style_updates)
+        counts = [after - before for after, before in zip(counts, base)]
+        print(f"{mode:>8} {saves[0]:>6} {counts[0]:>8} {counts[1]:>8} {counts[2]:>8} {counts[3]:>8}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="KeyIndicator 性能测试")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    sizes = argparse.ArgumentParser(add_help=False)
+    sizes.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 100000])
+
+    sub.add_parser("wheel", parents=[sizes], help="时间轮 vs 有序列表").set_defaults(func=bench_wheel)
+    sub.add_parser("gestures", parents=[sizes], help="手势识别").set_defaults(func=bench_gestures)
+
+    sub.add_parser("pipeline", parents=[sizes], help="无界面模式事件吞吐").set_defaults(func=bench_pipeline)
+
+    sub.add_parser("suspend", parents=[sizes], help="暂停模式下的按键开销").set_defaults(func=bench_suspend)
+
+    preview = sub.add_parser("preview", help="外观实时预览的重绘次数")
+    preview.add_argument("--repeat", type=int, default=1)
+    preview.set_defaults(func=bench_preview)
+
+    replay = sub.add_parser("replay", help="回放按键日志")
+    replay.add_argument("path")
+    replay.add_argument("--config", help="记录日志时使用的配置文件，默认为日志旁边的 config.json")
+    replay.set_defaults(func=bench_replay)
+
+    args = parser.parse_args()
+    args.func(args)
+
+
+if __name__ == "__main__":
+    main()
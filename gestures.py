@@ -0,0 +1,151 @@
+import time
+
+
+class Timer:
+    # 挂在时间轮某个槽位上的定时任务
+    __slots__ = ("callback", "rounds", "slot", "cancelled")
+
+    def __init__(self, callback, rounds, slot):
+        self.callback = callback
+        self.rounds = rounds
+        self.slot = slot
+        self.cancelled = False
+
+
+class TimingWheel:
+    # 哈希时间轮：所有定时任务共用一个轮子，由 Tk 循环驱动 tick，
+    # 调度和取消都是 O(1)，不为每个按键单独创建 after() 任务或线程。
+    def __init__(self, slots=512, tick_ms=10, clock=time.monotonic):
+        self.tick_ms = tick_ms
+        self._slots = [set() for _ in range(slots)]
+        self._cursor = 0
+        self._count = 0
+        self._clock = clock
+        self._last = clock()
+
+    def __len__(self):
+        return self._count
+
+    def schedule(self, delay_ms, callback):
+        # 轮子空闲时重置时间基准，避免 advance 补跑大量空 tick
+        if not self._count:
+            self._last = self._clock()
+
+        ticks = max(1, -(-int(delay_ms) // self.tick_ms))
+        size = len(self._slots)
+        slot = (self._cursor + ticks) % size
+        timer = Timer(callback, (ticks - 1) // size, slot)
+        self._slots[slot].add(timer)
+        self._count += 1
+        return timer
+
+    def cancel(self, timer):
+        if timer is None or timer.cancelled:
+            return
+        timer.cancelled = True
+        bucket = self._slots[timer.slot]
+        if timer in bucket:
+            bucket.remove(timer)
+            self._count -= 1
+
+    def tick(self):
+        self._cursor = (self._cursor + 1) % len(self._slots)
+        bucket = self._slots[self._cursor]
+        if not bucket:
+            return
+
+        due = []
+        for timer in bucket:
+            if timer.rounds:
+                timer.rounds -= 1
+            else:
+                due.append(timer)
+
+        for timer in due:
+            bucket.remove(timer)
+            self._count -= 1
+            timer.cancelled = True
+        # 回调放在最后执行，回调里再调度新任务也不会影响本次遍历
+        for timer in due:
+            timer.callback()
+
+    def advance(self):
+        # 按真实流逝时间补齐 tick（Tk 的 after 可能延迟）
+        now = self._clock()
+        if not self._count:
+            self._last = now
+            return
+
+        due = int((now - self._last) * 1000 // self.tick_ms)
+        self._last += due * self.tick_ms / 1000
+        for _ in range(due):
+            self.tick()
+            if not self._count:
+                self._last = now
+                break
+
+
+class GestureDetector:
+    # 识别 单击 / 长按 / 双击 手势。只能在 Tk 线程中调用。
+    TAP = "tap"
+    LONG_PRESS = "long_press"
+    DOUBLE_TAP = "double_tap"
+
+    _FIRED = object()  # 长按已触发的标记
+
+    def __init__(self, wheel, on_gesture, long_press_ms=600, double_tap_ms=300):
+        self.wheel = wheel
+        self.on_gesture = on_gesture
+        self.long_press_ms = long_press_ms
+        self.double_tap_ms = double_tap_ms
+        self.bindings = {}      # key -> 该键启用的手势集合
+        self._down = {}         # key -> 长按计时器 (或 None / _FIRED)
+        self._tap_windows = {}  # key -> 等待第二次单击的计时器
+
+    def configure(self, gestures, long_press_ms=None, double_tap_ms=None):
+        self.reset()
+        self.bindings = {key: set(kinds) for key, kinds in gestures.items()}
+        if long_press_ms is not None:
+            self.long_press_ms = int(long_press_ms)
+        if double_tap_ms is not None:
+            self.double_tap_ms = int(double_tap_ms)
+
+    def reset(self):
+        for timer in self._down.values():
+            if isinstance(timer, Timer):
+                self.wheel.cancel(timer)
+        for timer in self._tap_windows.values():
+            self.wheel.cancel(timer)
+        self._down.clear()
+        self._tap_windows.clear()
+
+    def press(self, key):
+        # 按住不放时系统会连续发送按下事件，只处理第一次
+        if key in self._down:
+            return
+
+        timer = None
+        if self.LONG_PRESS in self.bindings.get(key, ()):
+            timer = self.wheel.schedule(self.long_press_ms, lambda: self._fire_long_press(key))
+        self._down[key] = timer
+
+    def release(self, key):
+        timer = self._down.pop(key, None)
+        if timer is self._FIRED:
+            return
+        self.wheel.cancel(timer)
+
+        if self.DOUBLE_TAP in self.bindings.get(key, ()):
+            pending = self._tap_windows.pop(key, None)
+            if pending is not None:
+                self.wheel.cancel(pending)
+                self.on_gesture(key, self.DOUBLE_TAP)
+                return
+            self._tap_windows[key] = self.wheel.schedule(
+                self.double_tap_ms, lambda: self._tap_windows.pop(key, None))
+
+        self.on_gesture(key, self.TAP)
+
+    def _fire_long_press(self, key):
+        self._down[key] = self._FIRED
+        self.on_gesture(key, self.LONG_PRESS)
@@ -0,0 +1,351 @@
+import heapq
+import itertools
+import sys
+import threading
+import time
+
+try:
+    import evdev
+except ImportError:
+    evdev = None
+
+from keyevents import KeyEvent, KEY_DOWN, KEY_UP
+
+
+class HeadlessLoop:
+    # 替代 Tk 主循环：提供 after / after_cancel / mainloop，after 可在任意线程调用
+    def __init__(self, clock=time.monotonic):
+        self._clock = clock
+        self._jobs = []
+        self._live = set()
+        self._cancelled = set()
+        self._seq = itertools.count()
+        self._cond = threading.Condition()
+        self._running = False
+        self._quit_when_idle = False
+
+    def after(self, ms, func, *args):
+        with self._cond:
+            job = next(self._seq)
+            heapq.heappush(self._jobs, (self._clock() + ms / 1000, job, func, args))
+            self._live.add(job)
+            self._cond.notify()
+        return job
+
+    def after_cancel(self, job):
+        with self._cond:
+            # 与 Tk 一致：取消已执行或不存在的任务不报错
+            if job in self._live:
+                self._live.remove(job)
+                self._cancelled.add(job)
+
+    def _pop_due(self):
+        # 返回一个已到期的任务，没有则返回 None
+        while self._jobs:
+            due, job, func, args = self._jobs[0]
+            if job in self._cancelled:
+                heapq.heappop(self._jobs)
+                self._cancelled.discard(job)
+                continue
+            if due > self._clock():
+                return None
+            heapq.heappop(self._jobs)
+            self._live.discard(job)
+            return func, args
+        return None
+
+    def update(self):
+        # 类似 Tk 的 update()：执行所有已到期的任务后立即返回
+        while True:
+            with self._cond:
+                task = self._pop_due()
+            if task is None:
+                return
+            func, args = task
+            func(*args)
+
+    def pending(self):
+        with self._cond:
+            return len(self._live)
+
+    def mainloop(self):
+        self._running = True
+        while True:
+            with self._cond:
+                if not self._running:
+                    break
+                task = self._pop_due()
+                if task is None:
+                    if not self._jobs:
+                        if self._quit_when_idle:
+                            break
+                        self._cond.wait()
+                    else:
+                        self._cond.wait(max(0, self._jobs[0][0] - self._clock()))
+                    continue
+            func, args = task
+            func(*args)
+        self._running = False
+
+    def quit(self):
+        with self._cond:
+            self._running = False
+            self._cond.notify()
+
+    def quit_when_idle(self):
+        # 所有任务（包括淡出）执行完后退出
+        with self._cond:
+            self._quit_when_idle = True
+            self._cond.notify()
+
+
+class NullWindow:
+    # 实现 KeyIndicatorOSD 用到的 Toplevel 接口，不创建任何窗口
+    def __init__(self, loop, renderer, screen_size=(1920, 1080)):
+        self.loop = loop
+        self.renderer = renderer
+        self.screen_size = screen_size
+        self.attributes = {}
+        self.x = 0
+        self.y = 0
+        self.visible = False
+
+    def after(self, ms, func, *args):
+        return self.loop.after(ms, func, *args)
+
+    def after_cancel(self, job):
+        self.loop.after_cancel(job)
+
+    def withdraw(self):
+        if self.visible:
+            self.visible = False
+            self.renderer.on_hide()
+
+    def deiconify(self):
+        if not self.visible:
+            self.visible = True
+            self.renderer.on_show()
+
+    def geometry(self, spec):
+        # 只记录位置，格式同 Tk: "WxH+X+Y" 或 "+X+Y"
+        parts = spec.split("+")
+        if len(parts) == 3:
+            self.x, self.y = int(parts[1]), int(parts[2])
+        self.renderer.geometry_updates += 1
+
+    def wm_attributes(self, name, value=None):
+        self.attributes[name] = value
+        self.renderer.attribute_updates += 1
+
+    def configure(self, **kwargs):
+        pass
+
+    def overrideredirect(self, flag):
+        pass
+
+    def bind(self, sequence, func):
+        pass
+
+    def winfo_screenwidth(self):
+        return self.screen_size[0]
+
+    def winfo_screenheight(self):
+        return self.screen_size[1]
+
+    def winfo_x(self):
+        return self.x
+
+    def winfo_y(self):
+        return self.y
+
+
+class NullCanvas:
+    # 实现 KeyIndicatorOSD 用到的 Canvas 接口，只统计绘制次数
+    def __init__(self, renderer):
+        self.renderer = renderer
+        self._ids = itertools.count(1)
+
+    def pack(self, **kwargs):
+        pass
+
+    def bind(self, sequence, func):
+        pass
+
+    def create_text(self, x, y, **kwargs):
+        return next(self._ids)
+
+    def create_polygon(self, points, **kwargs):
+        self.renderer.redraws += 1
+        return next(self._ids)
+
+    def itemconfig(self, item, **kwargs):
+        if "text" in kwargs:
+            self.renderer.on_text(kwargs["text"])
+        else:
+            self.renderer.style_updates += 1
+
+    def coords(self, item, *args):
+        pass
+
+    def delete(self, tag):
+        pass
+
+    def tag_raise(self, item):
+        pass
+
+
+class NullRenderer:
+    # 无界面模式的渲染器：丢弃所有绘制，只做计数
+    def __init__(self, loop):
+        self.window = NullWindow(loop, self)
+        self.canvas = NullCanvas(self)
+        self.messages = 0
+        self.redraws = 0
+        self.style_updates = 0
+        self.geometry_updates = 0
+        self.attribute_updates = 0
+        self.last_text = ""
+
+    def on_text(self, text):
+        self.messages += 1
+        self.last_text = text
+
+    def on_show(self):
+        pass
+
+    def on_hide(self):
+        pass
+
+
+class LogRenderer(NullRenderer):
+    # 把 OSD 显示的内容输出到日志流
+    def __init__(self, loop, stream=None):
+        super().__init__(loop)
+        self.stream = stream or sys.stdout
+
+    def on_text(self, text):
+        super().on_text(text)
+        self.stream.write(f"[{time.strftime('%H:%M:%S')}] {text}\n")
+        self.stream.flush()
+
+
+class FakeHook:
+    # 与 keyboard 模块接口一致的假钩子，由 send() 注入事件
+    KEY_DOWN = KEY_DOWN
+    KEY_UP = KEY_UP
+
+    def __init__(self):
+        self._handlers = []
+        self._lock = threading.Lock()
+
+    def hook(self, callback):
+        self._add(None, None, callback)
+
+    def on_press_key(self, key, callback):
+        self._add(key, KEY_DOWN, callback)
+
+    def on_release_key(self, key, callback):
+        self._add(key, KEY_UP, callback)
+
+    def _add(self, key, event_type, callback):
+        with self._lock:
+            self._handlers = self._handlers + [(key, event_type, callback)]
+
+    def unhook_all(self):
+        with self._lock:
+            self._handlers = []
+
+    def hooked(self):
+        return bool(self._handlers)
+
+    def send(self, name, event_type, scan_code=0, timestamp=None):
+        # 在调用者线程中分发，相当于钩子线程。
+        # 与 keyboard 模块一致：先调用按键回调，再调用全局钩子
+        event = KeyEvent(name, event_type, scan_code, timestamp)
+        handlers = self._handlers
+        for key, handler_type, callback in handlers:
+            if key == name and handler_type == event_type:
+                callback(event)
+        for key, handler_type, callback in handlers:
+            if key is None:
+                callback(event)
+
+    def tap(self, name, scan_code=0):
+        self.send(name, KEY_DOWN, scan_code)
+        self.send(name, KEY_UP, scan_code)
+
+    def feed_lines(self, stream, on_eof=None):
+        # 每行一个按键名，模拟一次按下+松开；用于 `echo "caps lock" | main.py --headless`
+        def run():
+            for line in stream:
+                name = line.strip()
+                if name:
+                    self.tap(name)
+            if on_eof:
+                on_eof()
+        threading.Thread(target=run, daemon=True).start()
+
+
+def create_osd(config_file, renderer_class=NullRenderer, hook=None, clock=time.monotonic, **config):
+    # 创建无界面 OSD，返回 (loop, renderer, hook, osd)；供测试和性能测试使用。
+    # renderer_class 以事件循环为参数创建渲染器，config 覆盖默认配置项（不写盘）
+    from main import ConfigManager, KeyIndicatorOSD
+
+    loop = HeadlessLoop(clock)
+    renderer = renderer_class(loop)
+    if hook is None:
+        hook = FakeHook()
+    config_manager = ConfigManager(config_file)
+    config_manager.get_config().update(config)
+    osd = KeyIndicatorOSD(None, config_manager, renderer=renderer, hook=hook, clock=clock)
+    return loop, renderer, hook, osd
+
+
+# evdev 按键码到 keyboard 模块按键名的映射（只列出名字不同的按键）
+EVDEV_NAMES = {
+    "CAPSLOCK": "caps lock",
+    "LEFTSHIFT": "shift",
+    "RIGHTSHIFT": "shift",
+    "LEFTCTRL": "ctrl",
+    "RIGHTCTRL": "ctrl",
+    "LEFTALT": "alt",
+    "RIGHTALT": "alt",
+    "LEFTMETA": "windows",
+    "RIGHTMETA": "windows",
+    "NUMLOCK": "num lock",
+    "SCROLLLOCK": "scroll lock",
+    "ESC": "esc",
+    "BACKSPACE": "backspace",
+    "PAGEUP": "page up",
+    "PAGEDOWN": "page down",
+}
+
+
+class EvdevHook(FakeHook):
+    # 从 Linux 输入设备读取真实按键（需要安装 evdev 并有设备读取权限）
+    def __init__(self, device_path):
+        if evdev is None:
+            raise RuntimeError("未安装 evdev，无法读取输入设备")
+        super().__init__()
+        self.device = evdev.InputDevice(device_path)
+        threading.Thread(target=self._read_loop, daemon=True).start()
+
+    @staticmethod
+    def key_name(code):
+        name = evdev.ecodes.KEY.get(code, "")
+        if isinstance(name, list):
+            name = name[0]
+        name = name[4:] if name.startswith("KEY_") else name
+        return EVDEV_NAMES.get(name, name.lower().replace("_", " "))
+
+    def get_caps_lock_state(self):
+        # 直接读取键盘 LED，而不是猜测切换次数
+        return evdev.ecodes.LED_CAPSL in self.device.leds()
+
+    def _read_loop(self):
+        for event in self.device.read_loop():
+            if event.type != evdev.ecodes.EV_KEY:
+                continue
+            # value: 0 松开, 1 按下, 2 按住重复
+            event_type = KEY_UP if event.value == 0 else KEY_DOWN
+            self.send(self.key_name(event.code), event_type, event.code, event.timestamp())
@@ -0,0 +1,133 @@
+import argparse
+import mmap
+import os
+import struct
+import time
+
+# 文件头: 魔数, 版本, 单条记录长度, 容量(条), 已写入总条数, 长按阈值(ms), 双击阈值(ms)
+HEADER = struct.Struct("<4sHHIQHH")
+HEADER_SIZE = 32
+MAGIC = b"KIJ1"
+VERSION = 2
+SEQ_OFFSET = 12
+THRESHOLDS = struct.Struct("<HH")
+THRESHOLDS_OFFSET = 20
+
+# 记录: 时间戳, 扫描码, 事件类型, 分发结果, (填充), 渲染耗时(ms), 按键名
+# 扫描码有符号：没有扫描码的按键（多媒体键、模拟输入）由钩子记为 -vk
+# 按键名 (UTF-8, 超长截断) 用于回放时还原成钩子事件
+RECORD = struct.Struct("<diBBxxf16s")
+RENDER = struct.Struct("<f")
+RENDER_OFFSET = 16
+SEQ = struct.Struct("<Q")
+
+EVENT_DOWN = 1
+EVENT_UP = 2
+EVENT_NAMES = {EVENT_DOWN: "down", EVENT_UP: "up"}
+
+RESULT_IGNORED = 0
+RESULT_DISPATCHED = 1
+RESULT_GESTURE = 2
+RESULT_NAMES = {RESULT_IGNORED: "ignored", RESULT_DISPATCHED: "dispatched", RESULT_GESTURE: "gesture"}
+
+
+class EventJournal:
+    # 固定大小的内存映射环形日志。
+    # 钩子线程调用 record() 时只做 pack_into（内存拷贝），不格式化、不产生系统调用。
+    def __init__(self, path, capacity=65536):
+        self.path = path
+        self.capacity = int(capacity)
+        if self.capacity <= 0:
+            raise ValueError(f"按键日志容量必须大于 0: {capacity}")
+        size = HEADER_SIZE + self.capacity * RECORD.size
+
+        mode = 'r+b' if os.path.exists(path) else 'w+b'
+        self._file = open(path, mode)
+        if os.path.getsize(path) != size:
+            self._file.truncate(size)
+        self._map = mmap.mmap(self._file.fileno(), size)
+
+        magic, version, record_size, capacity, seq, _, _ = HEADER.unpack_from(self._map, 0)
+        if (magic, version, record_size, capacity) == (MAGIC, VERSION, RECORD.size, self.capacity):
+            # 继续写入已有日志
+            self._seq = seq
+        else:
+            self._seq = 0
+            HEADER.pack_into(self._map, 0, MAGIC, VERSION, RECORD.size, self.capacity, 0, 0, 0)
+
+    def set_thresholds(self, long_press_ms, double_tap_ms):
+        # 记录当前的手势阈值，回放时使用
+        THRESHOLDS.pack_into(self._map, THRESHOLDS_OFFSET, int(long_press_ms), int(double_tap_ms))
+
+    def record(self, timestamp, scan_code, event_type, result, name=""):
+        # 返回记录在文件中的偏移，之后可用于补写渲染耗时
+        seq = self._seq
+        offset = HEADER_SIZE + (seq % self.capacity) * RECORD.size
+        RECORD.pack_into(self._map, offset, timestamp, scan_code, event_type, result, 0.0,
+                         (name or "").encode("utf-8"))
+        self._seq = seq + 1
+        SEQ.pack_into(self._map, SEQ_OFFSET, seq + 1)
+        return offset
+
+    def set_render_time(self, offset, render_ms):
+        RENDER.pack_into(self._map, offset + RENDER_OFFSET, render_ms)
+
+    def close(self):
+        if self._map is not None:
+            self._map.flush()
+            self._map.close()
+            self._file.close()
+            self._map = None
+
+
+def _read(path):
+    with open(path, 'rb') as f:
+        data = f.read()
+
+    header = HEADER.unpack_from(data, 0)
+    magic, version, record_size = header[:3]
+    if magic != MAGIC or version != VERSION or record_size != RECORD.size:
+        raise ValueError(f"不是有效的按键日志文件: {path}")
+    return data, header
+
+
+def read_thresholds(path):
+    # 返回记录时的 (长按阈值, 双击阈值)，单位 ms；未记录时为 (0, 0)
+    _, header = _read(path)
+    return header[5], header[6]
+
+
+def read_journal(path):
+    # 按时间顺序返回 (时间戳, 扫描码, 事件类型, 分发结果, 渲染耗时, 按键名) 列表
+    data, header = _read(path)
+    capacity, seq = header[3], header[4]
+
+    first = max(0, seq - capacity)
+    records = []
+    for i in range(first, seq):
+        offset = HEADER_SIZE + (i % capacity) * RECORD.size
+        timestamp, scan_code, event_type, result, render_ms, name = RECORD.unpack_from(data, offset)
+        name = name.rstrip(b"\0").decode("utf-8", "replace")
+        records.append((timestamp, scan_code, event_type, result, render_ms, name))
+    return records
+
+
+def main():
+    parser = argparse.ArgumentParser(description="解码 KeyIndicator 按键日志")
+    parser.add_argument("path")
+    parser.add_argument("--limit", type=int, default=0, help="只显示最后 N 条")
+    args = parser.parse_args()
+
+    records = read_journal(args.path)
+    if args.limit:
+        records = records[-args.limit:]
+
+    for timestamp, scan_code, event_type, result, render_ms, name in records:
+        stamp = time.strftime("%H:%M:%S", time.localtime(timestamp))
+        millis = int(timestamp * 1000) % 1000
+        print(f"{stamp}.{millis:03d} scan={scan_code:<4} {name or '?':<12} {EVENT_NAMES.get(event_type, '?'):<4} "
+              f"{RESULT_NAMES.get(result, '?'):<10} render={render_ms:.2f}ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,16 @@
+import time
+
+# 与 keyboard 模块相同的事件类型取值，钩子来源（FakeHook / EvdevHook / Win32KeyboardHook）共用
+KEY_DOWN = "down"
+KEY_UP = "up"
+
+
+class KeyEvent:
+    # 与 keyboard.KeyboardEvent 中 OSD 用到的字段一致
+    __slots__ = ("name", "event_type", "scan_code", "time")
+
+    def __init__(self, name, event_type, scan_code=0, timestamp=None):
+        self.name = name
+        self.event_type = event_type
+        self.scan_code = scan_code
+        self.time = time.time() if timestamp is None else timestamp
@@ -1,32 +1,58 @@
 import tkinter as tk
 from tkinter import ttk, messagebox, colorchooser
-import keyboard
 import threading
 import time
 import ctypes
 import json
 import os
 import sys
-import winreg
-from PIL import Image, ImageDraw
-import pystray
+import argparse
+from gestures import TimingWheel, GestureDetector
+import journal
+import suspend
+
+# 以下依赖仅在 Windows 图形界面模式下需要，无界面模式 (--headless) 可以缺省
+try:
+    import keyboard
+except ImportError:
+    keyboard = None
+try:
+    import winreg
+except ImportError:
+    winreg = None
+try:
+    import pystray
+except ImportError:
+    pystray = None
+try:
+    # 托盘图标只依赖 Pillow
+    from tray_icons import TrayIconCache
+except ImportError:
+    TrayIconCache = None
 
 class KeyIndicatorOSD:
-    def __init__(self, root, config_manager):
-        # 使用 Toplevel 而不是新的 Tk 实例，因为主程序已经有一个 root 了
-        self.osd_window = tk.Toplevel(root)
+    def __init__(self, root, config_manager, renderer=None, hook=None, clock=time.monotonic):
         self.config_manager = config_manager
-        
-        # 窗口配置
-        self.osd_window.overrideredirect(True)  # 移除标题栏
-        self.osd_window.wm_attributes("-topmost", True)  # 始终置顶
-        self.osd_window.wm_attributes("-toolwindow", True)
+        # 按键钩子来源，默认为 keyboard 模块；无界面模式下可以是 FakeHook / EvdevHook
+        self.hook = hook or keyboard
         
         # 设置透明背景色（用于实现圆角）
         # Windows 上使用 -transparentcolor 来使特定颜色完全透明
         self.transparent_key = "#000001"  # 几乎纯黑，作为透明色键
-        self.osd_window.wm_attributes("-transparentcolor", self.transparent_key)
-        self.osd_window.configure(bg=self.transparent_key)
+        
+        if renderer is None:
+            # 使用 Toplevel 而不是新的 Tk 实例，因为主程序已经有一个 root 了
+            self.osd_window = tk.Toplevel(root)
+            
+            # 窗口配置
+            self.osd_window.overrideredirect(True)  # 移除标题栏
+            self.osd_window.wm_attributes("-topmost", True)  # 始终置顶
+            self.osd_window.wm_attributes("-toolwindow", True)
+            self.osd_window.wm_attributes("-transparentcolor", self.transparent_key)
+            self.osd_window.configure(bg=self.transparent_key)
+        else:
+            # 无界面模式：窗口和画布由 renderer 提供 (见 headless.py)
+            self.osd_window = renderer.window
         
         # 窗口尺寸
         self.window_width = 200
@@ -39,11 +65,14 @@ class KeyIndicatorOSD:
         self.load_position()
         
         # 使用 Canvas 绘制圆角背景
-        self.canvas = tk.Canvas(
-            self.osd_window,
-            bg=self.transparent_key,
-            highlightthickness=0
-        )
+        if renderer is None:
+            self.canvas = tk.Canvas(
+                self.osd_window,
+                bg=self.transparent_key,
+                highlightthickness=0
+            )
+        else:
+            self.canvas = renderer.canvas
         self.canvas.pack(fill='both', expand=True)
         
         # 在 Canvas 上创建文字标签（居中）
@@ -76,8 +105,28 @@ class KeyIndicatorOSD:
         # 状态追踪
         self.fade_job = None
         self.is_cn_mode = False
+        self.caps_on = False
+        self.paused = False
         self.last_shift_time = 0
         
+        # 启动时 Caps Lock 可能已经打开
+        self.caps_on = bool(self.read_caps_lock_state())
+        
+        # 状态变化监听者（如托盘图标），回调参数为 OSD 自身，可能在钩子线程中调用
+        self.state_listeners = []
+        
+        # 手势计时：所有按键共用一个时间轮，由 Tk 循环驱动（回放日志时使用模拟时钟）
+        self.timer_wheel = TimingWheel(clock=clock)
+        self.wheel_job = None
+        self.gestures = GestureDetector(self.timer_wheel, self.on_gesture)
+        
+        # 按键日志（可选），用于排查漏键问题
+        self.journal = None
+        self.journal_claimed = None   # 已由按键回调记录的事件（钩子线程）
+        self.gesture_offset = None    # 当前正在处理的手势事件的日志偏移（Tk 线程）
+        self.press_offsets = {}       # key -> 最近一次按下事件的日志偏移，用于长按
+        self.open_journal()
+        
         # 初始隐藏
         self.hide_window()
         
@@ -99,12 +148,7 @@ class KeyIndicatorOSD:
         self.corner_radius = int(self.corner_radius)
         
         # 动态计算窗口大小
-        self.window_height = int(self.font_size * 3)
-        self.window_width = int(self.font_size * 12)
-        
-        # 确保最小尺寸
-        self.window_height = max(40, self.window_height)
-        self.window_width = max(150, self.window_width)
+        self.update_window_size()
         
         # 整体透明度
         self.osd_window.wm_attributes("-alpha", self.opacity)
@@ -121,6 +165,56 @@ class KeyIndicatorOSD:
         # 重新应用位置和大小
         self.load_position()
 
+    def update_window_size(self):
+        self.window_height = int(self.font_size * 3)
+        self.window_width = int(self.font_size * 12)
+        
+        # 确保最小尺寸
+        self.window_height = max(40, self.window_height)
+        self.window_width = max(150, self.window_width)
+
+    def preview_appearance(self, font_size=None, opacity=None, corner_radius=None,
+                           bg_color=None, text_color=None, border_color=None):
+        # 实时预览：只更新发生变化的属性，不读写配置文件，也不重新定位窗口
+        # 返回是否有任何变化
+        changed = False
+        redraw = False
+        
+        if opacity is not None and float(opacity) != self.opacity:
+            self.opacity = float(opacity)
+            self.osd_window.wm_attributes("-alpha", self.opacity)
+            changed = True
+        
+        if font_size is not None and int(font_size) != self.font_size:
+            self.font_size = int(font_size)
+            self.update_window_size()
+            self.canvas.itemconfig(self.text_id, font=self.get_font())
+            self.canvas.coords(self.text_id, self.window_width // 2, self.window_height // 2)
+            # 只改尺寸，保持当前位置
+            self.osd_window.geometry(f"{self.window_width}x{self.window_height}")
+            redraw = True
+        
+        if corner_radius is not None and int(corner_radius) != self.corner_radius:
+            self.corner_radius = int(corner_radius)
+            redraw = True
+        
+        if bg_color is not None and bg_color != self.bg_color:
+            self.bg_color = bg_color
+            redraw = True
+        
+        if border_color is not None and border_color != self.border_color:
+            self.border_color = border_color
+            redraw = True
+        
+        if text_color is not None and text_color != self.text_color:
+            self.text_color = text_color
+            self.canvas.itemconfig(self.text_id, fill=self.text_color)
+            changed = True
+        
+        if redraw:
+            self.draw_background()
+        return changed or redraw
+
     def draw_background(self):
         self.canvas.delete("bg")
         
@@ -220,11 +314,16 @@ class KeyIndicatorOSD:
         if not self.is_dragging:
             self.osd_window.withdraw()
         
-    def show_message(self, text, duration=1500):
+    def show_message(self, text, duration=1500, journal_offset=None):
+        render_start = time.perf_counter()
         # self.label.config(text=text)
         self.canvas.itemconfig(self.text_id, text=text)
         self.osd_window.deiconify()
         
+        # 把渲染耗时补写到触发这次显示的日志记录中
+        if self.journal and journal_offset is not None:
+            self.journal.set_render_time(journal_offset, (time.perf_counter() - render_start) * 1000)
+        
         # 取消之前的淡出任务
         if self.fade_job:
             self.osd_window.after_cancel(self.fade_job)
@@ -232,59 +331,258 @@ class KeyIndicatorOSD:
         # 安排新的淡出
         self.fade_job = self.osd_window.after(duration, self.hide_window)
 
-    def get_caps_lock_state(self):
+    def read_caps_lock_state(self):
+        # 读取真实的 Caps Lock 状态，无法读取时返回 None
+        # 钩子来源可以自行提供（如 EvdevHook 读取键盘 LED）
+        reader = getattr(self.hook, "get_caps_lock_state", None)
+        if reader:
+            return bool(reader())
+        if sys.platform != "win32":
+            return None
         # VK_CAPITAL = 0x14
         hllDll = ctypes.WinDLL("User32.dll")
         VK_CAPITAL = 0x14
-        return hllDll.GetKeyState(VK_CAPITAL) & 1
+        return bool(hllDll.GetKeyState(VK_CAPITAL) & 1)
+
+    def get_caps_lock_state(self):
+        state = self.read_caps_lock_state()
+        if state is None:
+            # 无法读取系统状态（如 FakeHook），按每次切换处理
+            return not self.caps_on
+        return state
 
-    def handle_key_event(self, key_name):
+    def handle_key_event(self, key_name, journal_offset=None):
         # 特殊按键处理
         if key_name == 'caps lock':
             # 稍微延迟以等待系统状态更新
             time.sleep(0.05)
+        text = self.describe_key(key_name)
+        if text:
+            self.schedule_update(text, journal_offset)
+
+    def describe_key(self, key_name):
+        if key_name == 'caps lock':
             state = self.get_caps_lock_state()
+            if bool(state) != self.caps_on:
+                self.caps_on = bool(state)
+                self.notify_state()
             status = "ON" if state else "OFF"
-            self.schedule_update(f"Caps Lock: {status}")
+            return f"Caps Lock: {status}"
         elif key_name == 'shift':
             # 简单的 Shift 切换模拟
             current_time = time.time()
             if current_time - self.last_shift_time < 0.2:
-                return
+                return None
             self.last_shift_time = current_time
             
             self.is_cn_mode = not self.is_cn_mode
+            self.notify_state()
             status = "中" if self.is_cn_mode else "英"
-            self.schedule_update(f"输入法: {status}")
+            return f"输入法: {status}"
         else:
             # 普通按键直接显示名称
-            self.schedule_update(f"按键: {key_name.upper()}")
+            return f"按键: {key_name.upper()}"
+
+    def notify_state(self):
+        for listener in self.state_listeners:
+            listener(self)
 
-    def schedule_update(self, text):
+    def schedule_update(self, text, journal_offset=None):
         # 线程安全的 GUI 更新
-        self.osd_window.after(0, lambda: self.show_message(text))
+        self.osd_window.after(0, lambda: self.show_message(text, journal_offset=journal_offset))
+
+    def schedule_gesture(self, key_name, pressed, journal_offset=None):
+        # 钩子线程只负责转发，手势识别和计时都在 Tk 线程完成
+        self.osd_window.after(0, lambda: self._gesture_input(key_name, pressed, journal_offset))
+
+    def _gesture_input(self, key_name, pressed, journal_offset):
+        if pressed:
+            self.press_offsets[key_name] = journal_offset
+        # 松开时同步产生的 单击/双击 属于这次事件
+        self.gesture_offset = journal_offset
+        try:
+            if pressed:
+                self.gestures.press(key_name)
+            else:
+                self.gestures.release(key_name)
+        finally:
+            self.gesture_offset = None
+        self.start_timer_wheel()
+
+    def on_gesture(self, key_name, gesture):
+        # 由时间轮触发的长按属于之前的按下事件
+        offset = self.gesture_offset
+        if offset is None:
+            offset = self.press_offsets.get(key_name)
+        
+        # 每次按下/松开都要更新按键状态（Caps Lock、输入法），手势只决定显示哪条提示
+        if key_name == 'caps lock' and gesture != GestureDetector.LONG_PRESS:
+            # 同样等待系统状态更新，但不阻塞 Tk 线程；长按触发时状态早已更新
+            self.timer_wheel.schedule(50, lambda: self.show_key(key_name, gesture, offset))
+        else:
+            self.show_key(key_name, gesture, offset)
+
+    def show_key(self, key_name, gesture=GestureDetector.TAP, journal_offset=None):
+        text = self.describe_key(key_name)
+        if gesture != GestureDetector.TAP:
+            gestures = self.config_manager.get_gestures()
+            text = gestures.get(key_name, {}).get(gesture) or text
+        if text:
+            self.show_message(text, journal_offset=journal_offset)
+
+    def start_timer_wheel(self):
+        # 仅在有待触发的计时器时才驱动时间轮，空闲时不占用 CPU
+        if self.wheel_job is None and len(self.timer_wheel):
+            self.wheel_job = self.osd_window.after(self.timer_wheel.tick_ms, self.tick_timer_wheel)
+
+    def tick_timer_wheel(self):
+        self.wheel_job = None
+        self.timer_wheel.advance()
+        self.start_timer_wheel()
+
+    def open_journal(self):
+        config = self.config_manager.get_config()
+        if not config.get("journal_enabled", False):
+            return
+        try:
+            self.journal = journal.EventJournal(
+                self.config_manager.get_journal_path(),
+                config.get("journal_records", 65536)
+            )
+        except Exception as e:
+            print(f"打开按键日志失败: {e}")
+
+    def journal_record(self, event, result):
+        # 在钩子线程中运行，只做内存写入；返回记录偏移，未开启日志或写入失败时返回 None。
+        # 异常不能抛回钩子线程，否则之后的按键都不会再被分发
+        if not self.journal:
+            return None
+        self.journal_claimed = event
+        event_type = journal.EVENT_DOWN if event.event_type == self.hook.KEY_DOWN else journal.EVENT_UP
+        try:
+            return self.journal.record(event.time, event.scan_code or 0, event_type, result, event.name)
+        except Exception as e:
+            print(f"写入按键日志失败: {e}")
+            return None
+
+    def journal_event(self, event):
+        # 全局钩子在按键回调之后运行（与 keyboard 模块一致），
+        # 按键回调已经记录过的事件不再重复记录，其余事件记为未分发
+        if event is self.journal_claimed:
+            self.journal_claimed = None
+            return
+        self.journal_record(event, journal.RESULT_IGNORED)
+
+    def suspend_listeners(self):
+        # 暂停：卸载所有钩子，而不仅仅是隐藏 OSD。
+        # 使用 Win32KeyboardHook（配置 win32_hook）时系统钩子本身也会被移除；
+        # 若钩子来源是 keyboard 模块，它的底层钩子无法卸载，只是不再分发回调
+        self.paused = True
+        self.update_listeners()
+        self.gestures.reset()
+        self.hide_window()
+        self.notify_state()
+
+    def resume_listeners(self):
+        self.paused = False
+        self.update_listeners()
+        self.notify_state()
 
     def update_listeners(self):
         # 清除所有旧的钩子
         try:
-            keyboard.unhook_all()
+            self.hook.unhook_all()
         except:
             pass
+        
+        # 暂停期间不安装任何钩子，恢复时由 resume_listeners 重新安装
+        if self.paused:
+            return
             
         # 获取需要监听的按键列表
         monitored_keys = self.config_manager.get_monitored_keys()
         
+        # 重新加载手势配置
+        config = self.config_manager.get_config()
+        gestures = self.config_manager.get_gestures()
+        self.gestures.configure(
+            gestures,
+            long_press_ms=config.get("long_press_ms", 600),
+            double_tap_ms=config.get("double_tap_ms", 300)
+        )
+        
+        if self.journal:
+            self.journal.set_thresholds(self.gestures.long_press_ms, self.gestures.double_tap_ms)
+            # 记录所有事件；实际被处理的那一侧 (按下/松开) 由下面的按键回调记录
+            self.hook.hook(self.journal_event)
+        
+        gesture_result = journal.RESULT_GESTURE
+        dispatched = journal.RESULT_DISPATCHED
         for key in monitored_keys:
             try:
                 # 使用闭包捕获 key 变量
                 # 注意：keyboard.on_release_key 在单独线程运行
-                if key == 'shift':
-                    keyboard.on_press_key(key, lambda e, k=key: self.handle_key_event(k))
+                if key in gestures:
+                    # 配置了手势的按键需要同时监听按下和松开
+                    self.hook.on_press_key(key, lambda e, k=key: self.schedule_gesture(k, True, self.journal_record(e, gesture_result)))
+                    self.hook.on_release_key(key, lambda e, k=key: self.schedule_gesture(k, False, self.journal_record(e, gesture_result)))
+                elif key == 'shift':
+                    self.hook.on_press_key(key, lambda e, k=key: self.handle_key_event(k, self.journal_record(e, dispatched)))
                 else:
-                    keyboard.on_release_key(key, lambda e, k=key: self.handle_key_event(k))
+                    self.hook.on_release_key(key, lambda e, k=key: self.handle_key_event(k, self.journal_record(e, dispatched)))
             except ValueError:
                 print(f"无法监听按键: {key}")
 
+class AppearancePreview:
+    # 设置界面的实时预览：滑块事件按帧率合并，只把变化的属性应用到 OSD，
+    # 用户提交时才写一次配置文件
+    FRAME_MS = 16
+    
+    def __init__(self, scheduler, config_manager, get_osd):
+        self.scheduler = scheduler
+        self.config_manager = config_manager
+        self.get_osd = get_osd
+        self.pending = {}
+        self.job = None
+        self.dirty = False  # OSD 上是否有尚未保存的预览
+
+    def update(self, **changes):
+        self.pending.update(changes)
+        if self.job is None:
+            self.job = self.scheduler.after(self.FRAME_MS, self.flush)
+
+    def flush(self):
+        self.job = None
+        changes, self.pending = self.pending, {}
+        osd = self.get_osd()
+        if osd and changes and osd.preview_appearance(**changes):
+            self.dirty = True
+            osd.show_message("预览样式 ABC")
+
+    def cancel(self):
+        if self.job is not None:
+            self.scheduler.after_cancel(self.job)
+            self.job = None
+        self.pending = {}
+
+    def commit(self, bg_color, text_color, border_color, font_size, opacity, corner_radius):
+        self.cancel()
+        self.pending.update(
+            bg_color=bg_color, text_color=text_color, border_color=border_color,
+            font_size=font_size, opacity=opacity, corner_radius=corner_radius
+        )
+        self.flush()
+        self.config_manager.update_appearance(bg_color, text_color, border_color, font_size, opacity, corner_radius)
+        self.dirty = False
+
+    def revert(self):
+        # 放弃未保存的预览，OSD 恢复为配置文件中的外观
+        self.cancel()
+        self.dirty = False
+        osd = self.get_osd()
+        if osd:
+            osd.apply_appearance()
+
 class ConfigManager:
     def __init__(self, config_file="config.json"):
         # 确定配置文件路径
@@ -295,6 +593,7 @@ class ConfigManager:
             # 如果是脚本运行，配置文件放在脚本同级目录
             application_path = os.path.dirname(os.path.abspath(__file__))
             
+        self.application_path = application_path
         self.config_file = os.path.join(application_path, config_file)
         self.load_error = None
         self.config = self._load_config()
@@ -310,7 +609,16 @@ class ConfigManager:
             "border_color": "#77ffff",
             "font_size": 17,
             "opacity": 0.8,
-            "corner_radius": 100
+            "corner_radius": 100,
+            "long_press_ms": 600,
+            "double_tap_ms": 300,
+            "gestures": {},
+            "journal_enabled": False,
+            "journal_file": "keyindicator.journal",
+            "journal_records": 65536,
+            "auto_suspend": True,
+            "suspend_poll_ms": 500,
+            "win32_hook": False
         }
         
         try:
@@ -356,6 +664,16 @@ class ConfigManager:
     def get_monitored_keys(self):
         return self.config["monitored_keys"]
 
+    def get_gestures(self):
+        # 格式: {按键: {手势: 提示文字}}，手势为 long_press / double_tap，默认不启用
+        # 例如 {"caps lock": {"long_press": "Caps Lock: 长按"}, "shift": {"double_tap": "Shift: 双击"}}
+        # 注意：配置了手势的按键改为在松开时显示提示（shift 原本在按下时显示）
+        return self.config.get("gestures", {})
+
+    def get_journal_path(self):
+        journal_file = self.config.get("journal_file", "keyindicator.journal")
+        return os.path.join(self.application_path, journal_file)
+
     def set_startup(self, enable):
         key_path = r"Software\Microsoft\Windows\CurrentVersion\Run"
         app_name = "KeyIndicator"
@@ -450,7 +768,16 @@ class ConfigManager:
             "border_color": "#77ffff",
             "font_size": 17,
             "opacity": 0.8,
-            "corner_radius": 100
+            "corner_radius": 100,
+            "long_press_ms": 600,
+            "double_tap_ms": 300,
+            "gestures": {},
+            "journal_enabled": False,
+            "journal_file": "keyindicator.journal",
+            "journal_records": 65536,
+            "auto_suspend": True,
+            "suspend_poll_ms": 500,
+            "win32_hook": False
         }
         self.save_config()
 
@@ -472,7 +799,10 @@ class MainWindow:
         self.config_manager.fix_startup_path()
         
         self.osd = None
+        self.suspend_controller = None
         self.tray_icon = None
+        self.tray_icons = TrayIconCache() if TrayIconCache else None
+        self.preview = AppearancePreview(self.root, self.config_manager, lambda: self.osd)
         
         self.setup_ui()
         
@@ -483,19 +813,46 @@ class MainWindow:
         self.root.protocol("WM_DELETE_WINDOW", self.on_close)
 
     def create_tray_icon(self):
-        image = Image.new('RGB', (64, 64), color=(30, 30, 30))
-        d = ImageDraw.Draw(image)
-        d.text((10, 20), "Key", fill=(255, 255, 255))
+        # 托盘图标和线程只创建一次，之后最小化/恢复都复用
+        if self.tray_icon:
+            return
+        if pystray is None or self.tray_icons is None:
+            print("未安装 pystray 或 Pillow，无法创建托盘图标")
+            return
+        
+        # 预先绘制所有状态的图标，状态切换时只需替换图片
+        self.tray_icons.prerender()
         
         menu = (
             pystray.MenuItem("显示设置", self.show_window),
+            pystray.MenuItem("暂停监听", self.toggle_suspend, checked=lambda item: bool(self.suspend_controller and self.suspend_controller.manual)),
             pystray.MenuItem("退出", self.quit_app)
         )
         
-        self.tray_icon = pystray.Icon("KeyIndicator", image, "按键提示器", menu)
+        self.tray_icon = pystray.Icon("KeyIndicator", self.current_tray_image(), "按键提示器", menu)
         # 在单独线程运行 tray，避免阻塞 tkinter
         threading.Thread(target=self.tray_icon.run, daemon=True).start()
 
+    def current_tray_image(self):
+        if not self.osd:
+            return self.tray_icons.get()
+        return self.tray_icons.get(self.osd.caps_on, self.osd.is_cn_mode, self.osd.paused)
+
+    def on_osd_state_change(self, osd):
+        # 与 OSD 使用同一个状态变化事件；可能在钩子线程中调用，统一切回 Tk 线程更新托盘
+        self.root.after(0, self.update_tray_icon)
+
+    def update_tray_icon(self):
+        # 托盘尚未创建时无需处理
+        if self.tray_icon:
+            self.tray_icon.icon = self.current_tray_image()
+            self.tray_icon.update_menu()
+
+    def toggle_suspend(self, icon=None, item=None):
+        # 托盘菜单在 pystray 线程中回调，切回 Tk 线程处理
+        if self.suspend_controller:
+            self.root.after(0, self.suspend_controller.toggle)
+
     def show_window(self, icon=None, item=None):
         self.root.after(0, self.root.deiconify)
 
@@ -507,6 +864,10 @@ class MainWindow:
         os._exit(0)
 
     def on_close(self):
+        # 关闭设置窗口时丢弃未保存的外观预览
+        if self.preview.dirty:
+            self.revert_appearance_changes()
+        
         action = self.config_manager.get_close_action()
         
         if action == "minimize":
@@ -520,12 +881,14 @@ class MainWindow:
         self.show_close_dialog()
 
     def minimize_to_tray(self):
-        self.root.withdraw()
+        self.create_tray_icon()
         if not self.tray_icon:
-            self.create_tray_icon()
+            # 没有托盘图标时隐藏窗口就无法再恢复，改为最小化到任务栏
+            self.root.iconify()
+            return
+        self.root.withdraw()
         # 托盘提示
-        if self.tray_icon:
-            self.tray_icon.notify("程序已最小化到托盘，双击图标或右键菜单可恢复", "按键提示器")
+        self.tray_icon.notify("程序已最小化到托盘，双击图标或右键菜单可恢复", "按键提示器")
 
     def show_close_dialog(self):
         dialog = tk.Toplevel(self.root)
@@ -576,7 +939,22 @@ class MainWindow:
                 # 在 GUI 初始化前，我们只能打印。GUI 初始化后可以弹窗，但这里尽量早点提示。
 
     def init_osd(self):
-        self.osd = KeyIndicatorOSD(self.root, self.config_manager)
+        # 默认使用 keyboard 模块。win32_hook 为试验选项：改用自己管理生命周期的系统钩子，
+        # 暂停时可以真正卸载（keyboard 模块的钩子安装后无法卸载，暂停时只是不再分发回调）
+        config = self.config_manager.get_config()
+        hook = None
+        if sys.platform == "win32" and config.get("win32_hook", False):
+            import winhook
+            hook = winhook.Win32KeyboardHook()
+        self.osd = KeyIndicatorOSD(self.root, self.config_manager, hook=hook)
+        self.osd.state_listeners.append(self.on_osd_state_change)
+        
+        # 全屏 / 安全输入时自动卸载钩子
+        self.suspend_controller = suspend.SuspendController(
+            self.osd,
+            suspend.default_foreground_provider(config.get("suspend_poll_ms", 500)),
+            auto_suspend=config.get("auto_suspend", True)
+        )
 
     def setup_ui(self):
         # 创建选项卡控件
@@ -658,6 +1036,11 @@ class MainWindow:
         self.radius_scale.set(config.get("corner_radius", 10))
         self.radius_scale.pack(fill='x', padx=20)
         
+        # 拖动滑块时实时预览（按帧率合并，不写配置文件）
+        self.font_size_scale.config(command=lambda v: self.preview.update(font_size=int(float(v))))
+        self.opacity_scale.config(command=lambda v: self.preview.update(opacity=float(v)))
+        self.radius_scale.config(command=lambda v: self.preview.update(corner_radius=int(float(v))))
+        
         # 颜色选择
         colors_frame = tk.Frame(parent)
         colors_frame.pack(fill='x', padx=20, pady=10)
@@ -680,8 +1063,11 @@ class MainWindow:
         # 恢复默认按钮
         tk.Button(btn_frame, text="恢复默认", command=self.restore_defaults).pack(side='left', padx=(0, 10))
         
+        # 放弃未保存的预览
+        tk.Button(btn_frame, text="放弃更改", command=self.revert_appearance_changes).pack(side='left', padx=(0, 10))
+        
         # 应用按钮
-        tk.Button(btn_frame, text="应用更改并预览", command=self.apply_appearance_changes, height=2).pack(side='left', expand=True, fill='x')
+        tk.Button(btn_frame, text="保存更改", command=self.apply_appearance_changes, height=2).pack(side='left', expand=True, fill='x')
 
         # 显示配置文件路径 (用于调试)
         path_frame = tk.Frame(parent)
@@ -693,23 +1079,27 @@ class MainWindow:
         color = colorchooser.askcolor(title="选择背景颜色", color=self.bg_color_var)[1]
         if color:
             self.bg_color_var = color
+            self.preview.update(bg_color=color)
             
     def choose_text_color(self):
         color = colorchooser.askcolor(title="选择文字颜色", color=self.text_color_var)[1]
         if color:
             self.text_color_var = color
+            self.preview.update(text_color=color)
 
     def choose_border_color(self):
         color = colorchooser.askcolor(title="选择边框颜色", color=self.border_color_var)[1]
         if color:
             self.border_color_var = color
+            self.preview.update(border_color=color)
 
     def apply_appearance_changes(self):
         font_size = self.font_size_scale.get()
         opacity = self.opacity_scale.get()
         corner_radius = self.radius_scale.get()
         
-        self.config_manager.update_appearance(
+        # 预览已经应用了大部分改动，这里只补上剩余的变化并保存一次
+        self.preview.commit(
             self.bg_color_var,
             self.text_color_var,
             self.border_color_var,
@@ -717,10 +1107,20 @@ class MainWindow:
             opacity,
             corner_radius
         )
-        
-        if self.osd:
-            self.osd.apply_appearance()
-            self.osd.show_message("预览样式 ABC")
+
+    def revert_appearance_changes(self):
+        self.preview.revert()
+        self.sync_appearance_ui()
+
+    def sync_appearance_ui(self):
+        # 滑块和颜色与当前配置保持一致（恢复默认 / 放弃更改后调用）
+        config = self.config_manager.get_config()
+        self.font_size_scale.set(config.get("font_size", 16))
+        self.opacity_scale.set(config.get("opacity", 0.8))
+        self.radius_scale.set(config.get("corner_radius", 10))
+        self.bg_color_var = config.get("bg_color", "#1e1e1e")
+        self.text_color_var = config.get("text_color", "#ffffff")
+        self.border_color_var = config.get("border_color", "#444444")
 
     def start_recording_key(self):
         self.record_btn.config(text="请按下一个按键...", state='disabled', bg="#ffcccc")
@@ -728,11 +1128,13 @@ class MainWindow:
         threading.Thread(target=self._wait_for_key, daemon=True).start()
 
     def _wait_for_key(self):
+        # 使用 OSD 的钩子来源读取，避免启动 keyboard 模块无法卸载的监听线程
+        hook = self.osd.hook if self.osd else keyboard
         # 读取下一个键盘事件
-        event = keyboard.read_event()
+        event = hook.read_event()
         # 只需要按下的事件
-        while event.event_type != keyboard.KEY_DOWN:
-            event = keyboard.read_event()
+        while event.event_type != hook.KEY_DOWN:
+            event = hook.read_event()
         
         # 回到主线程更新 UI
         self.root.after(0, lambda: self.finish_recording_key(event.name))
@@ -776,13 +1178,45 @@ class MainWindow:
             self.config_manager.reset_defaults()
             self.refresh_list()
             self.refresh_listeners()
+            # 外观也恢复默认：OSD 重新应用配置（包括位置），设置界面同步
+            self.revert_appearance_changes()
             if self.osd:
-                self.osd.load_position()
                 self.osd.show_message("已恢复默认设置")
 
     def run(self):
         self.root.mainloop()
 
+def run_headless(args):
+    # 无界面模式：不需要显示器和 Windows DLL，OSD 输出到空渲染器或日志
+    import headless
+    
+    loop = headless.HeadlessLoop()
+    if args.renderer == "log":
+        renderer = headless.LogRenderer(loop)
+    else:
+        renderer = headless.NullRenderer(loop)
+    
+    config_manager = ConfigManager(args.config) if args.config else ConfigManager()
+    hook = headless.EvdevHook(args.evdev) if args.evdev else headless.FakeHook()
+    KeyIndicatorOSD(None, config_manager, renderer=renderer, hook=hook)
+    
+    if not args.evdev:
+        # 从标准输入读取按键名，每行一个；输入结束且提示淡出后退出
+        hook.feed_lines(sys.stdin, on_eof=lambda: loop.after(0, loop.quit_when_idle))
+    loop.mainloop()
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="按键提示器")
+    parser.add_argument("--headless", action="store_true", help="无界面模式，不创建任何窗口")
+    parser.add_argument("--renderer", choices=["null", "log"], default="log", help="无界面模式下的渲染器")
+    parser.add_argument("--evdev", metavar="DEVICE", help="无界面模式下从 Linux 输入设备读取按键，如 /dev/input/event3")
+    parser.add_argument("--config", help="配置文件名（相对于程序目录）")
+    return parser.parse_args(argv)
+
 if __name__ == "__main__":
-    app = MainWindow()
-    app.run()
+    args = parse_args()
+    if args.headless:
+        run_headless(args)
+    else:
+        app = MainWindow()
+        app.run()
@@ -0,0 +1,307 @@
+import ctypes
+import sys
+import threading
+import time
+
+REASON_FULLSCREEN = "fullscreen"
+REASON_SECURE = "secure"
+REASON_MANUAL = "manual"
+
+
+class FakeForegroundProvider:
+    # 测试/无界面模式使用：通过 set_state() 模拟前台窗口变化
+    def __init__(self):
+        self.fullscreen = False
+        self.secure = False
+        self._callbacks = []
+
+    def subscribe(self, callback):
+        self._callbacks.append(callback)
+
+    def start(self, window):
+        pass
+
+    def set_state(self, fullscreen=None, secure=None):
+        if fullscreen is not None:
+            self.fullscreen = fullscreen
+        if secure is not None:
+            self.secure = secure
+        for callback in self._callbacks:
+            callback(self.fullscreen, self.secure)
+
+
+class Win32ForegroundProvider(FakeForegroundProvider):
+    # 由 WinEvent 事件驱动：前台窗口切换、前台窗口位置/大小变化、焦点变化、桌面切换时才重新检查，
+    # 平时不轮询。只有处于安全桌面（UAC 等）时才按 poll_ms 检查是否已经返回，
+    # 因为此时本进程可能收不到事件
+    MONITOR_DEFAULTTONEAREST = 2
+    DESKTOP_SWITCHDESKTOP = 0x0100
+    UOI_NAME = 2
+    GWL_STYLE = -16
+    WS_CAPTION = 0x00C00000
+    ES_PASSWORD = 0x0020
+    DWMWA_EXTENDED_FRAME_BOUNDS = 9
+    EVENT_SYSTEM_FOREGROUND = 0x0003
+    EVENT_SYSTEM_DESKTOPSWITCH = 0x0020
+    EVENT_OBJECT_FOCUS = 0x8005
+    EVENT_OBJECT_LOCATIONCHANGE = 0x800B
+    WINEVENT_OUTOFCONTEXT = 0x0000
+    OBJID_WINDOW = 0
+    CHILDID_SELF = 0
+    # 点击桌面或 Win+D 后前台窗口是铺满屏幕的桌面窗口，不算全屏程序
+    DESKTOP_CLASSES = ("workerw", "progman")
+
+    def __init__(self, poll_ms=500):
+        from ctypes import wintypes
+
+        super().__init__()
+        self.poll_ms = poll_ms
+        self.window = None
+        self.user32 = ctypes.windll.user32
+        self.dwmapi = ctypes.windll.dwmapi
+
+        # 事件钩子使用单独的 user32 实例设置参数类型，不影响其他模块
+        self.events = ctypes.WinDLL("user32", use_last_error=True)
+        self.WINEVENTPROC = ctypes.WINFUNCTYPE(None, wintypes.HANDLE, wintypes.DWORD, wintypes.HWND,
+                                               wintypes.LONG, wintypes.LONG, wintypes.DWORD, wintypes.DWORD)
+        self.events.SetWinEventHook.argtypes = [wintypes.DWORD, wintypes.DWORD, wintypes.HMODULE, self.WINEVENTPROC,
+                                                wintypes.DWORD, wintypes.DWORD, wintypes.DWORD]
+        self.events.SetWinEventHook.restype = wintypes.HANDLE
+        self.events.UnhookWinEvent.argtypes = [wintypes.HANDLE]
+        self.events.GetForegroundWindow.restype = wintypes.HWND
+        self.events.GetWindowThreadProcessId.argtypes = [wintypes.HWND, ctypes.POINTER(wintypes.DWORD)]
+        self.events.GetMessageW.argtypes = [ctypes.POINTER(wintypes.MSG), wintypes.HWND, wintypes.UINT, wintypes.UINT]
+
+        self._proc = None
+        self._foreground = None
+        self._location_hook = None
+        self._refresh_pending = False
+        self._poll_job = None
+
+    def start(self, window):
+        self.window = window
+        self.refresh()
+        # 事件回调在注册它的线程的消息循环中执行，使用单独线程，结果再交给 Tk 线程处理
+        threading.Thread(target=self._run_events, daemon=True).start()
+
+    def _run_events(self):
+        from ctypes import wintypes
+
+        self._proc = self.WINEVENTPROC(self._on_event)
+        for event in (self.EVENT_SYSTEM_FOREGROUND, self.EVENT_SYSTEM_DESKTOPSWITCH, self.EVENT_OBJECT_FOCUS):
+            if not self.events.SetWinEventHook(event, event, None, self._proc, 0, 0, self.WINEVENT_OUTOFCONTEXT):
+                print(f"注册前台窗口事件失败: {ctypes.get_last_error()}")
+        self._watch_location(self.events.GetForegroundWindow())
+
+        msg = wintypes.MSG()
+        while self.events.GetMessageW(ctypes.byref(msg), None, 0, 0) > 0:
+            self.events.TranslateMessage(ctypes.byref(msg))
+            self.events.DispatchMessageW(ctypes.byref(msg))
+
+    def _watch_location(self, hwnd):
+        # 只监听前台窗口所在进程的位置变化（如游戏切换到全屏），避免接收所有窗口的移动事件
+        from ctypes import wintypes
+
+        if self._location_hook:
+            self.events.UnhookWinEvent(self._location_hook)
+            self._location_hook = None
+        self._foreground = hwnd
+        if not hwnd:
+            return
+        pid = wintypes.DWORD()
+        self.events.GetWindowThreadProcessId(hwnd, ctypes.byref(pid))
+        event = self.EVENT_OBJECT_LOCATIONCHANGE
+        self._location_hook = self.events.SetWinEventHook(event, event, None, self._proc, pid.value, 0,
+                                                          self.WINEVENT_OUTOFCONTEXT)
+
+    def _on_event(self, hook, event, hwnd, id_object, id_child, thread, timestamp):
+        # 在事件线程中运行
+        if event == self.EVENT_OBJECT_LOCATIONCHANGE:
+            if hwnd != self._foreground or id_object != self.OBJID_WINDOW or id_child != self.CHILDID_SELF:
+                return
+        elif event == self.EVENT_SYSTEM_FOREGROUND:
+            self._watch_location(hwnd)
+
+        # 拖动窗口等连续事件合并为一次检查
+        if not self._refresh_pending:
+            self._refresh_pending = True
+            self.window.after(0, self.refresh)
+
+    def refresh(self):
+        # 在 Tk 线程中检查当前状态，变化时通知
+        self._refresh_pending = False
+        try:
+            fullscreen = self.is_foreground_fullscreen()
+            secure_desktop = self.is_secure_desktop()
+            secure = secure_desktop or self.is_password_focus()
+        except Exception as e:
+            print(f"检测前台窗口失败: {e}")
+            return
+
+        if (fullscreen, secure) != (self.fullscreen, self.secure):
+            self.set_state(fullscreen, secure)
+        if secure_desktop and self._poll_job is None:
+            self._poll_job = self.window.after(self.poll_ms, self._poll_secure_desktop)
+
+    def _poll_secure_desktop(self):
+        self._poll_job = None
+        self.refresh()
+
+    def get_class_name(self, hwnd):
+        name = ctypes.create_unicode_buffer(256)
+        self.user32.GetClassNameW(hwnd, name, 256)
+        return name.value.lower()
+
+    def get_window_bounds(self, hwnd):
+        # GetWindowRect 包含不可见的缩放边框（约 8px），最大化窗口也会超出显示器；
+        # 优先使用 DWM 的实际可见范围
+        from ctypes import wintypes
+
+        rect = wintypes.RECT()
+        if self.dwmapi.DwmGetWindowAttribute(hwnd, self.DWMWA_EXTENDED_FRAME_BOUNDS,
+                                             ctypes.byref(rect), ctypes.sizeof(rect)) != 0:
+            self.user32.GetWindowRect(hwnd, ctypes.byref(rect))
+        return rect
+
+    def is_foreground_fullscreen(self):
+        from ctypes import wintypes
+
+        class MONITORINFO(ctypes.Structure):
+            _fields_ = [("cbSize", wintypes.DWORD), ("rcMonitor", wintypes.RECT),
+                        ("rcWork", wintypes.RECT), ("dwFlags", wintypes.DWORD)]
+
+        hwnd = self.user32.GetForegroundWindow()
+        # 桌面和任务栏不算全屏
+        if not hwnd or hwnd in (self.user32.GetDesktopWindow(), self.user32.GetShellWindow()):
+            return False
+        if self.get_class_name(hwnd) in self.DESKTOP_CLASSES:
+            return False
+        # 最大化或带标题栏的普通窗口即使铺满显示器（无任务栏 / 任务栏自动隐藏）也不算全屏
+        if self.user32.IsZoomed(hwnd):
+            return False
+        if self.user32.GetWindowLongW(hwnd, self.GWL_STYLE) & self.WS_CAPTION == self.WS_CAPTION:
+            return False
+
+        rect = self.get_window_bounds(hwnd)
+        info = MONITORINFO()
+        info.cbSize = ctypes.sizeof(MONITORINFO)
+        monitor = self.user32.MonitorFromWindow(hwnd, self.MONITOR_DEFAULTTONEAREST)
+        if not self.user32.GetMonitorInfoW(monitor, ctypes.byref(info)):
+            return False
+
+        screen = info.rcMonitor
+        return (rect.left <= screen.left and rect.top <= screen.top and
+                rect.right >= screen.right and rect.bottom >= screen.bottom)
+
+    def is_secure_desktop(self):
+        from ctypes import wintypes
+
+        # UAC / Ctrl+Alt+Del 等安全桌面：无法打开输入桌面，或桌面名不是 Default
+        desktop = self.user32.OpenInputDesktop(0, False, self.DESKTOP_SWITCHDESKTOP)
+        if not desktop:
+            return True
+        try:
+            name = ctypes.create_unicode_buffer(256)
+            needed = wintypes.DWORD()
+            self.user32.GetUserObjectInformationW(desktop, self.UOI_NAME, name, ctypes.sizeof(name), ctypes.byref(needed))
+            return name.value.lower() != "default"
+        finally:
+            self.user32.CloseDesktop(desktop)
+
+    def is_password_focus(self):
+        from ctypes import wintypes
+
+        # 普通程序中的密码框（仅支持标准 Edit 控件）
+        class GUITHREADINFO(ctypes.Structure):
+            _fields_ = [("cbSize", wintypes.DWORD), ("flags", wintypes.DWORD),
+                        ("hwndActive", wintypes.HWND), ("hwndFocus", wintypes.HWND),
+                        ("hwndCapture", wintypes.HWND), ("hwndMenuOwner", wintypes.HWND),
+                        ("hwndMoveSize", wintypes.HWND), ("hwndCaret", wintypes.HWND),
+                        ("rcCaret", wintypes.RECT)]
+
+        info = GUITHREADINFO()
+        info.cbSize = ctypes.sizeof(GUITHREADINFO)
+        if not self.user32.GetGUIThreadInfo(0, ctypes.byref(info)) or not info.hwndFocus:
+            return False
+        # ES_PASSWORD 这一位在其他窗口类中有不同含义，只对 Edit 控件判断
+        if self.get_class_name(info.hwndFocus) != "edit":
+            return False
+        return bool(self.user32.GetWindowLongW(info.hwndFocus, self.GWL_STYLE) & self.ES_PASSWORD)
+
+
+def default_foreground_provider(poll_ms=500):
+    if sys.platform == "win32":
+        return Win32ForegroundProvider(poll_ms)
+    return FakeForegroundProvider()
+
+
+class SuspendController:
+    # 全屏游戏 / 密码输入 / 托盘手动暂停时完全卸载钩子，条件解除后重新安装。
+    # 同时统计钩子安装与暂停的时长。
+    def __init__(self, osd, provider, auto_suspend=True, clock=time.monotonic):
+        self.osd = osd
+        self.provider = provider
+        self.auto_suspend = auto_suspend
+        self.reasons = set()
+        self.transitions = 0
+        self.hooked_seconds = 0.0
+        self.suspended_seconds = 0.0
+        self._clock = clock
+        self._since = clock()
+
+        provider.subscribe(self.on_foreground_change)
+        provider.start(osd.osd_window)
+
+    @property
+    def suspended(self):
+        return self.osd.paused
+
+    @property
+    def manual(self):
+        return REASON_MANUAL in self.reasons
+
+    def on_foreground_change(self, fullscreen, secure):
+        if not self.auto_suspend:
+            fullscreen = secure = False
+        self._set_reason(REASON_FULLSCREEN, fullscreen)
+        self._set_reason(REASON_SECURE, secure)
+        self._apply()
+
+    def toggle(self):
+        self._set_reason(REASON_MANUAL, not self.manual)
+        self._apply()
+
+    def _set_reason(self, reason, active):
+        if active:
+            self.reasons.add(reason)
+        else:
+            self.reasons.discard(reason)
+
+    def _apply(self):
+        should_suspend = bool(self.reasons)
+        if should_suspend == self.suspended:
+            return
+
+        self._account()
+        self.transitions += 1
+        if should_suspend:
+            self.osd.suspend_listeners()
+        else:
+            self.osd.resume_listeners()
+
+    def _account(self):
+        now = self._clock()
+        if self.suspended:
+            self.suspended_seconds += now - self._since
+        else:
+            self.hooked_seconds += now - self._since
+        self._since = now
+
+    def stats(self):
+        self._account()
+        return {
+            "hooked_seconds": self.hooked_seconds,
+            "suspended_seconds": self.suspended_seconds,
+            "transitions": self.transitions,
+            "reasons": sorted(self.reasons),
+        }
@@ -0,0 +1,31 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+class FakeClock:
+    # 手动推进的时钟，单位秒
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+
+@pytest.fixture
+def headless_osd(tmp_path):
+    # 创建无界面 OSD，返回 (loop, renderer, hook, osd)；config 为额外的配置项
+    import headless
+
+    def make(hook=None, renderer_class=headless.NullRenderer, **config):
+        return headless.create_osd(str(tmp_path / "config.json"), renderer_class, hook=hook, **config)
+
+    return make
@@ -0,0 +1,92 @@
+import time
+
+from gestures import TimingWheel, GestureDetector
+
+
+def run_for(loop, seconds):
+    # 真实等待，同时驱动无界面事件循环
+    end = time.monotonic() + seconds
+    while time.monotonic() < end:
+        loop.update()
+        time.sleep(0.005)
+    loop.update()
+
+
+def test_wheel_fires_after_delay_and_cancel_is_removed(clock):
+    wheel = TimingWheel(slots=8, tick_ms=10, clock=clock)
+    fired = []
+    wheel.schedule(30, lambda: fired.append("a"))
+    wheel.schedule(200, lambda: fired.append("b"))  # 超过一圈
+    cancelled = wheel.schedule(20, lambda: fired.append("c"))
+    wheel.cancel(cancelled)
+    assert len(wheel) == 2
+
+    clock.now = 0.05
+    wheel.advance()
+    assert fired == ["a"]
+
+    clock.now = 0.25
+    wheel.advance()
+    assert fired == ["a", "b"]
+    assert len(wheel) == 0
+
+
+def test_detector_long_press_suppresses_tap(clock):
+    wheel = TimingWheel(clock=clock)
+    events = []
+    detector = GestureDetector(wheel, lambda key, gesture: events.append(gesture), long_press_ms=100)
+    detector.configure({"caps lock": {"long_press": "x"}})
+
+    detector.press("caps lock")
+    detector.press("caps lock")  # 自动重复
+    clock.now = 0.2
+    wheel.advance()
+    detector.release("caps lock")
+    assert events == ["long_press"]
+
+
+def test_detector_double_tap_replaces_second_tap(clock):
+    wheel = TimingWheel(clock=clock)
+    events = []
+    detector = GestureDetector(wheel, lambda key, gesture: events.append(gesture))
+    detector.configure({"shift": {"double_tap": "x"}})
+
+    for _ in range(2):
+        detector.press("shift")
+        detector.release("shift")
+    assert events == ["tap", "double_tap"]
+
+
+def test_gestures_are_opt_in(headless_osd):
+    loop, renderer, hook, osd = headless_osd()
+    assert osd.config_manager.get_gestures() == {}
+    hook.tap("shift")
+    loop.update()
+    assert renderer.last_text == "输入法: 中"
+
+
+def test_long_press_caps_lock_updates_state(headless_osd):
+    loop, renderer, hook, osd = headless_osd(
+        gestures={"caps lock": {"long_press": "Caps Lock: 长按"}}, long_press_ms=100)
+
+    hook.send("caps lock", hook.KEY_DOWN)
+    run_for(loop, 0.2)
+    hook.send("caps lock", hook.KEY_UP)
+    run_for(loop, 0.1)
+
+    assert renderer.last_text == "Caps Lock: 长按"
+    assert osd.caps_on
+
+
+def test_shift_double_tap_toggles_input_mode_twice(headless_osd):
+    loop, renderer, hook, osd = headless_osd(
+        gestures={"shift": {"double_tap": "Shift: 双击"}}, double_tap_ms=400)
+
+    hook.tap("shift")
+    run_for(loop, 0.25)
+    assert osd.is_cn_mode
+    hook.tap("shift")
+    run_for(loop, 0.02)
+
+    assert renderer.last_text == "Shift: 双击"
+    assert not osd.is_cn_mode
@@ -0,0 +1,42 @@
+import io
+
+import headless
+
+
+class LedHook(headless.FakeHook):
+    # 模拟能读取键盘 LED 的钩子来源（如 EvdevHook）
+    def __init__(self, caps_lock):
+        super().__init__()
+        self.caps_lock = caps_lock
+
+    def get_caps_lock_state(self):
+        return self.caps_lock
+
+
+def test_caps_lock_state_comes_from_hook_source(headless_osd):
+    hook = LedHook(caps_lock=True)
+    loop, renderer, hook, osd = headless_osd(hook=hook)
+    assert osd.caps_on
+
+    # 系统按下 Caps Lock 后 LED 熄灭
+    hook.caps_lock = False
+    hook.tap("caps lock")
+    loop.update()
+    assert renderer.last_text == "Caps Lock: OFF"
+    assert not osd.caps_on
+
+
+def test_fake_hook_without_leds_toggles(headless_osd):
+    loop, renderer, hook, osd = headless_osd()
+    assert not osd.caps_on
+    hook.tap("caps lock")
+    loop.update()
+    assert renderer.last_text == "Caps Lock: ON"
+
+
+def test_log_renderer_writes_messages(headless_osd):
+    stream = io.StringIO()
+    loop, renderer, hook, osd = headless_osd(renderer_class=lambda loop: headless.LogRenderer(loop, stream))
+    hook.tap("shift")
+    loop.update()
+    assert "输入法: 中" in stream.getvalue()
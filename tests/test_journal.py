@@ -0,0 +1,89 @@
+import struct
+
+import pytest
+
+import journal
+
+
+def test_capacity_must_be_positive(tmp_path):
+    with pytest.raises(ValueError):
+        journal.EventJournal(str(tmp_path / "k.journal"), capacity=0)
+
+
+def test_ring_keeps_latest_records(tmp_path):
+    path = str(tmp_path / "k.journal")
+    j = journal.EventJournal(path, capacity=4)
+    for i in range(6):
+        j.record(float(i), i, journal.EVENT_DOWN, journal.RESULT_IGNORED)
+    j.close()
+
+    records = journal.read_journal(path)
+    assert [r[1] for r in records] == [2, 3, 4, 5]
+
+
+def test_results_and_render_time_follow_the_handled_event(headless_osd, tmp_path):
+    path = str(tmp_path / "k.journal")
+    loop, renderer, hook, osd = headless_osd(
+        journal_enabled=True, journal_file=path, journal_records=8, monitored_keys=["a", "shift"])
+
+    hook.tap("a", scan_code=30)      # 松开时处理
+    hook.tap("shift", scan_code=42)  # 按下时处理
+    hook.tap("x", scan_code=45)      # 未监控
+    loop.update()
+    osd.journal.close()
+
+    records = [(scan, event_type, result, render > 0) for _, scan, event_type, result, render, _ in journal.read_journal(path)]
+    assert records == [
+        (30, journal.EVENT_DOWN, journal.RESULT_IGNORED, False),
+        (30, journal.EVENT_UP, journal.RESULT_DISPATCHED, True),
+        (42, journal.EVENT_DOWN, journal.RESULT_DISPATCHED, True),
+        (42, journal.EVENT_UP, journal.RESULT_IGNORED, False),
+        (45, journal.EVENT_DOWN, journal.RESULT_IGNORED, False),
+        (45, journal.EVENT_UP, journal.RESULT_IGNORED, False),
+    ]
+
+
+def test_negative_scan_codes_are_recorded(headless_osd, tmp_path):
+    # 多媒体键、模拟输入没有扫描码，钩子给出 -vk
+    path = str(tmp_path / "k.journal")
+    loop, renderer, hook, osd = headless_osd(
+        journal_enabled=True, journal_file=path, journal_records=8, monitored_keys=["volume up"])
+
+    hook.tap("volume up", scan_code=-175)
+    hook.tap("volume up", scan_code=-175)
+    loop.update()
+    osd.journal.close()
+
+    assert renderer.messages == 2
+    records = journal.read_journal(path)
+    assert [r[1] for r in records] == [-175] * 4
+    assert [r[3] for r in records] == [journal.RESULT_IGNORED, journal.RESULT_DISPATCHED] * 2
+
+
+def test_journal_errors_do_not_stop_dispatch(headless_osd, tmp_path):
+    loop, renderer, hook, osd = headless_osd(
+        journal_enabled=True, journal_file=str(tmp_path / "k.journal"), monitored_keys=["a"])
+
+    def broken_record(*args):
+        raise struct.error("argument out of range")
+    osd.journal.record = broken_record
+
+    hook.tap("a")
+    hook.tap("a")
+    loop.update()
+    assert renderer.messages == 2
+
+
+def test_key_names_and_thresholds_are_recorded(headless_osd, tmp_path):
+    # 回放需要按键名和记录时的手势阈值
+    path = str(tmp_path / "k.journal")
+    loop, renderer, hook, osd = headless_osd(
+        journal_enabled=True, journal_file=path, monitored_keys=["caps lock"],
+        long_press_ms=450, double_tap_ms=250)
+
+    hook.tap("caps lock", scan_code=58)
+    hook.tap("a very long key name", scan_code=1)
+    osd.journal.close()
+
+    assert [r[5] for r in journal.read_journal(path)] == ["caps lock"] * 2 + ["a very long key "] * 2
+    assert journal.read_thresholds(path) == (450, 250)
@@ -0,0 +1,63 @@
+from main import AppearancePreview
+
+
+def make_preview(headless_osd):
+    loop, renderer, hook, osd = headless_osd()
+    saves = []
+    save_config = osd.config_manager.save_config
+    osd.config_manager.save_config = lambda: saves.append(1) or save_config()
+    preview = AppearancePreview(loop, osd.config_manager, lambda: osd)
+    return loop, renderer, osd, preview, saves
+
+
+def commit_args(osd, **changes):
+    values = dict(bg_color=osd.bg_color, text_color=osd.text_color, border_color=osd.border_color,
+                  font_size=osd.font_size, opacity=osd.opacity, corner_radius=osd.corner_radius)
+    values.update(changes)
+    return values
+
+
+def test_updates_are_batched_per_frame(headless_osd):
+    loop, renderer, osd, preview, saves = make_preview(headless_osd)
+    redraws = renderer.redraws
+    for radius in range(10, 40):
+        preview.update(corner_radius=radius)
+    preview.flush()
+
+    assert osd.corner_radius == 39
+    assert renderer.redraws == redraws + 1
+    assert preview.dirty and not saves
+
+
+def test_revert_restores_saved_appearance(headless_osd):
+    loop, renderer, osd, preview, saves = make_preview(headless_osd)
+    saved = osd.config_manager.get_config()["opacity"]
+    preview.update(opacity=0.3, font_size=30)
+    preview.flush()
+    assert osd.opacity == 0.3
+
+    preview.revert()
+    assert osd.opacity == saved
+    assert osd.font_size == osd.config_manager.get_config()["font_size"]
+    assert not preview.dirty and not saves
+
+
+def test_commit_saves_once_and_shows_preview_once(headless_osd):
+    loop, renderer, osd, preview, saves = make_preview(headless_osd)
+    messages = renderer.messages
+    preview.update(corner_radius=5)
+    preview.commit(**commit_args(osd, corner_radius=5, opacity=0.5))
+
+    assert saves == [1]
+    assert osd.config_manager.get_config()["opacity"] == 0.5
+    assert osd.opacity == 0.5 and osd.corner_radius == 5
+    assert renderer.messages == messages + 1
+    assert not preview.dirty
+
+
+def test_revert_after_reset_defaults_applies_defaults(headless_osd):
+    loop, renderer, osd, preview, saves = make_preview(headless_osd)
+    preview.commit(**commit_args(osd, font_size=40))
+    osd.config_manager.reset_defaults()
+    preview.revert()
+    assert osd.font_size == osd.config_manager.get_config()["font_size"] != 40
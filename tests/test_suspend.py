@@ -0,0 +1,84 @@
+import pytest
+
+import suspend
+
+
+@pytest.fixture
+def suspended_osd(headless_osd, clock):
+    loop, renderer, hook, osd = headless_osd()
+    provider = suspend.FakeForegroundProvider()
+    controller = suspend.SuspendController(osd, provider, clock=clock)
+    return hook, osd, provider, clock, controller
+
+
+def test_fullscreen_unhooks_and_resume_reinstalls(suspended_osd):
+    hook, osd, provider, clock, controller = suspended_osd
+    assert hook.hooked()
+
+    provider.set_state(fullscreen=True)
+    assert controller.suspended and osd.paused
+    assert not hook.hooked()
+    assert controller.reasons == {suspend.REASON_FULLSCREEN}
+
+    provider.set_state(fullscreen=False)
+    assert not controller.suspended
+    assert hook.hooked()
+
+
+def test_refresh_while_suspended_keeps_hooks_removed(suspended_osd):
+    hook, osd, provider, clock, controller = suspended_osd
+    provider.set_state(secure=True)
+    osd.update_listeners()
+    assert not hook.hooked()
+
+
+def test_stays_suspended_until_every_reason_clears(suspended_osd):
+    hook, osd, provider, clock, controller = suspended_osd
+    provider.set_state(secure=True)
+    controller.toggle()
+    assert controller.reasons == {suspend.REASON_SECURE, suspend.REASON_MANUAL}
+
+    provider.set_state(secure=False)
+    assert controller.suspended and controller.manual
+    assert not hook.hooked()
+
+    controller.toggle()
+    assert not controller.suspended
+    assert hook.hooked()
+
+
+def test_auto_suspend_disabled_ignores_foreground(headless_osd):
+    loop, renderer, hook, osd = headless_osd()
+    provider = suspend.FakeForegroundProvider()
+    controller = suspend.SuspendController(osd, provider, auto_suspend=False)
+
+    provider.set_state(fullscreen=True, secure=True)
+    assert not controller.suspended
+    controller.toggle()
+    assert controller.suspended
+
+
+def test_time_accounting(suspended_osd):
+    hook, osd, provider, clock, controller = suspended_osd
+    clock.now = 3.0
+    provider.set_state(fullscreen=True)
+    clock.now = 5.0
+    provider.set_state(fullscreen=False)
+    clock.now = 6.5
+    controller.toggle()
+    clock.now = 7.0
+
+    stats = controller.stats()
+    assert stats["hooked_seconds"] == pytest.approx(4.5)
+    assert stats["suspended_seconds"] == pytest.approx(2.5)
+    assert stats["transitions"] == 3
+    assert stats["reasons"] == [suspend.REASON_MANUAL]
+
+
+def test_suspend_updates_tray_state(suspended_osd):
+    hook, osd, provider, clock, controller = suspended_osd
+    seen = []
+    osd.state_listeners.append(lambda o: seen.append(o.paused))
+    controller.toggle()
+    controller.toggle()
+    assert seen == [True, False]
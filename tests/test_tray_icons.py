@@ -0,0 +1,36 @@
+import itertools
+
+import pytest
+
+pytest.importorskip("PIL")
+
+from tray_icons import TrayIconCache, render_icon
+
+STATES = list(itertools.product((False, True), repeat=3))
+
+
+def test_render_icon_differs_by_state():
+    images = [render_icon(*state, size=32).tobytes() for state in STATES]
+    assert len(set(images)) == len(STATES)
+
+
+def test_render_icon_size():
+    assert render_icon(size=16).size == (16, 16)
+
+
+def test_cache_returns_same_object():
+    cache = TrayIconCache()
+    assert cache.get(True, False, False) is cache.get(True, False, False)
+    assert cache.get(True, False, False) is not cache.get(False, False, False)
+    assert len(cache) == 2
+
+
+def test_prerender_fills_every_state():
+    cache = TrayIconCache()
+    cache.prerender(sizes=(16, 64))
+    assert len(cache) == len(STATES) * 2
+
+    first = cache.get(True, True, True, 16)
+    cache.prerender(sizes=(16, 64))
+    assert len(cache) == len(STATES) * 2
+    assert cache.get(True, True, True, 16) is first
@@ -0,0 +1,48 @@
+from PIL import Image, ImageDraw
+
+BG_COLOR = (30, 30, 30)
+PAUSED_BG_COLOR = (90, 90, 90)
+TEXT_COLOR = (255, 255, 255)
+CAPS_ON_COLOR = (132, 255, 163)
+CAPS_OFF_COLOR = (70, 70, 70)
+
+
+def render_icon(caps_on=False, cn_mode=False, paused=False, size=64):
+    # 托盘图标：上方色条表示 Caps Lock，文字表示输入法，暂停时背景变灰
+    image = Image.new('RGB', (size, size), color=PAUSED_BG_COLOR if paused else BG_COLOR)
+    d = ImageDraw.Draw(image)
+
+    bar = max(2, size // 6)
+    d.rectangle((0, 0, size - 1, bar - 1), fill=CAPS_ON_COLOR if caps_on else CAPS_OFF_COLOR)
+
+    text = "CN" if cn_mode else "EN"
+    left, top, right, bottom = d.textbbox((0, 0), text)
+    x = (size - (right - left)) // 2 - left
+    y = bar + (size - bar - (bottom - top)) // 2 - top
+    d.text((x, y), text, fill=TEXT_COLOR)
+    return image
+
+
+class TrayIconCache:
+    # 每种状态 + 尺寸只绘制一次，之后直接复用
+    def __init__(self, size=64):
+        self.size = size
+        self._images = {}
+
+    def get(self, caps_on=False, cn_mode=False, paused=False, size=None):
+        key = (bool(caps_on), bool(cn_mode), bool(paused), size or self.size)
+        image = self._images.get(key)
+        if image is None:
+            image = render_icon(*key)
+            self._images[key] = image
+        return image
+
+    def prerender(self, sizes=None):
+        for size in sizes or (self.size,):
+            for caps_on in (False, True):
+                for cn_mode in (False, True):
+                    for paused in (False, True):
+                        self.get(caps_on, cn_mode, paused, size)
+
+    def __len__(self):
+        return len(self._images)
@@ -0,0 +1,201 @@
+import ctypes
+import queue
+import threading
+import time
+
+try:
+    import keyboard
+except ImportError:
+    keyboard = None
+
+from keyevents import KeyEvent, KEY_DOWN, KEY_UP
+
+WH_KEYBOARD_LL = 13
+HC_ACTION = 0
+WM_QUIT = 0x0012
+WM_KEYUP = 0x0101
+WM_SYSKEYUP = 0x0105
+VK_PACKET = 0xE7
+LLKHF_EXTENDED = 0x01
+
+
+class Win32KeyboardHook:
+    # 自己管理 SetWindowsHookEx / UnhookWindowsHookEx 的键盘钩子，接口与 keyboard 模块一致。
+    # 只有在注册了回调时才安装系统钩子；unhook_all() 后系统钩子和线程都会被移除，
+    # 暂停期间按键不会再进入 Python。（keyboard 模块的钩子一旦安装就无法卸载）
+    KEY_DOWN = KEY_DOWN
+    KEY_UP = KEY_UP
+
+    def __init__(self):
+        from ctypes import wintypes
+
+        self.user32 = ctypes.WinDLL("user32", use_last_error=True)
+        self.kernel32 = ctypes.WinDLL("kernel32", use_last_error=True)
+
+        class KBDLLHOOKSTRUCT(ctypes.Structure):
+            _fields_ = [("vkCode", wintypes.DWORD), ("scanCode", wintypes.DWORD),
+                        ("flags", wintypes.DWORD), ("time", wintypes.DWORD),
+                        ("dwExtraInfo", ctypes.c_size_t)]
+
+        self.KBDLLHOOKSTRUCT = KBDLLHOOKSTRUCT
+        self.HOOKPROC = ctypes.WINFUNCTYPE(wintypes.LPARAM, ctypes.c_int, wintypes.WPARAM, wintypes.LPARAM)
+        self.user32.SetWindowsHookExW.argtypes = [ctypes.c_int, self.HOOKPROC, wintypes.HINSTANCE, wintypes.DWORD]
+        self.user32.SetWindowsHookExW.restype = wintypes.HHOOK
+        self.user32.CallNextHookEx.argtypes = [wintypes.HHOOK, ctypes.c_int, wintypes.WPARAM, wintypes.LPARAM]
+        self.user32.CallNextHookEx.restype = wintypes.LPARAM
+        self.user32.UnhookWindowsHookEx.argtypes = [wintypes.HHOOK]
+        self.user32.PostThreadMessageW.argtypes = [wintypes.DWORD, wintypes.UINT, wintypes.WPARAM, wintypes.LPARAM]
+        self.user32.GetMessageW.argtypes = [ctypes.POINTER(wintypes.MSG), wintypes.HWND, wintypes.UINT, wintypes.UINT]
+        self.user32.GetKeyNameTextW.argtypes = [wintypes.LONG, wintypes.LPWSTR, ctypes.c_int]
+        self.kernel32.GetModuleHandleW.restype = wintypes.HMODULE
+
+        self._handlers = []
+        self._lock = threading.Lock()
+        self._names = {}
+        self._thread = None
+        self._thread_id = None
+        self._events = None
+        self._proc = None
+        self.installs = 0  # 安装系统钩子的次数，便于确认暂停时确实卸载过
+
+    def hook(self, callback):
+        self._add(None, None, callback)
+        return callback
+
+    def on_press_key(self, key, callback):
+        self._add(self._scan_codes(key), KEY_DOWN, callback)
+
+    def on_release_key(self, key, callback):
+        self._add(self._scan_codes(key), KEY_UP, callback)
+
+    def _scan_codes(self, key):
+        # 按键名解析沿用 keyboard 模块的名称表（不会启动它的监听线程），未知按键抛出 ValueError
+        if keyboard is None:
+            raise ValueError(f"无法解析按键: {key}")
+        scan_codes = set(keyboard.key_to_scan_codes(key))
+        for scan_code in scan_codes:
+            self._names.setdefault(scan_code, key)
+        return scan_codes
+
+    def _add(self, scan_codes, event_type, callback):
+        with self._lock:
+            self._handlers = self._handlers + [(scan_codes, event_type, callback)]
+        self._install()
+
+    def _remove(self, callback):
+        with self._lock:
+            self._handlers = [h for h in self._handlers if h[2] is not callback]
+            empty = not self._handlers
+        if empty:
+            self._uninstall()
+
+    def unhook_all(self):
+        with self._lock:
+            self._handlers = []
+        self._uninstall()
+
+    def hooked(self):
+        return self._thread is not None
+
+    def read_event(self):
+        # 阻塞等待下一个按键事件，用于录制按键；结束后如无其他回调则卸载钩子
+        events = queue.Queue()
+        callback = self.hook(events.put)
+        try:
+            return events.get()
+        finally:
+            self._remove(callback)
+
+    def _install(self):
+        with self._lock:
+            if self._thread is not None:
+                return
+            ready = threading.Event()
+            self._events = queue.Queue()
+            self._thread = threading.Thread(target=self._run_hook, args=(ready,), daemon=True)
+            self._thread.start()
+            threading.Thread(target=self._dispatch_loop, args=(self._events,), daemon=True).start()
+        ready.wait()
+
+    def _uninstall(self):
+        with self._lock:
+            thread, thread_id, events = self._thread, self._thread_id, self._events
+            self._thread = self._thread_id = self._events = None
+        if thread is None:
+            return
+        # 让钩子线程退出消息循环，由它自己调用 UnhookWindowsHookEx
+        self.user32.PostThreadMessageW(thread_id, WM_QUIT, 0, 0)
+        events.put(None)
+        if thread is not threading.current_thread():
+            thread.join()
+
+    def _run_hook(self, ready):
+        from ctypes import wintypes
+
+        self._thread_id = self.kernel32.GetCurrentThreadId()
+        self._proc = self.HOOKPROC(self._callback)
+        handle = self.user32.SetWindowsHookExW(WH_KEYBOARD_LL, self._proc, self.kernel32.GetModuleHandleW(None), 0)
+        if not handle:
+            print(f"安装键盘钩子失败: {ctypes.get_last_error()}")
+            # 清除状态并结束分发线程，hooked() 返回 False，下次注册回调时重试
+            with self._lock:
+                events = self._events
+                if self._thread is threading.current_thread():
+                    self._thread = self._thread_id = self._events = None
+            events.put(None)
+            ready.set()
+            return
+        self.installs += 1
+        ready.set()
+
+        msg = wintypes.MSG()
+        try:
+            while self.user32.GetMessageW(ctypes.byref(msg), None, 0, 0) > 0:
+                self.user32.TranslateMessage(ctypes.byref(msg))
+                self.user32.DispatchMessageW(ctypes.byref(msg))
+        finally:
+            self.user32.UnhookWindowsHookEx(handle)
+
+    def _callback(self, code, wparam, lparam):
+        # 系统钩子回调要尽快返回，只把事件放入队列，由分发线程调用回调
+        events = self._events
+        if code == HC_ACTION and events is not None:
+            info = ctypes.cast(lparam, ctypes.POINTER(self.KBDLLHOOKSTRUCT)).contents
+            if info.vkCode != VK_PACKET:
+                event_type = KEY_UP if wparam in (WM_KEYUP, WM_SYSKEYUP) else KEY_DOWN
+                scan_code = info.scanCode or -info.vkCode
+                extended = info.flags & LLKHF_EXTENDED
+                events.put((scan_code, extended, event_type, time.time()))
+        return self.user32.CallNextHookEx(None, code, wparam, lparam)
+
+    def _key_name(self, scan_code, extended):
+        name = self._names.get(scan_code)
+        if name is None:
+            buffer = ctypes.create_unicode_buffer(64)
+            self.user32.GetKeyNameTextW((scan_code << 16) | (extended << 24), buffer, 64)
+            name = buffer.value.lower() or None
+            self._names[scan_code] = name
+        return name
+
+    def _dispatch_loop(self, events):
+        # 与 keyboard 模块一致：在单独线程中按顺序分发，先按键回调后全局钩子
+        while True:
+            item = events.get()
+            if item is None:
+                return
+            scan_code, extended, event_type, timestamp = item
+            event = KeyEvent(self._key_name(scan_code, extended), event_type, scan_code, timestamp)
+            handlers = self._handlers
+            for scan_codes, handler_type, callback in handlers:
+                if scan_codes is not None and scan_code in scan_codes and handler_type == event_type:
+                    self._call(callback, event)
+            for scan_codes, handler_type, callback in handlers:
+                if scan_codes is None:
+                    self._call(callback, event)
+
+    def _call(self, callback, event):
+        # 单个回调出错不能中断分发线程，否则之后所有按键都不会再被处理
+        try:
+            callback(event)
+        except Exception as e:
+            print(f"按键回调出错 ({event.name}): {e!r}")